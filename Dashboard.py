@@ -1,5 +1,5 @@
 import streamlit as st
-import groq 
+from module import clients
 import os 
 
 # streamlit page configuration
@@ -252,7 +252,7 @@ KNOWLEDGE_BASE = """
 """
 
 try:
-    client = groq.Groq(api_key=st.secrets["GROQ_API_KEY"])
+    client = clients.groq()  # built once per process, not on every rerun
     chat_available = True
 except Exception:
     client = None
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from module import webclient
+from module.cache import cache_path
+
+
+# Article pages are re-used across videos, pages (Current Context Report,
+# Automate) and days, so they are kept on disk between runs.
+ARTICLE_TTL = 24 * 60 * 60              # seconds before a page is revalidated
+ARTICLE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # compressed bodies, LRU-evicted past this
+
+# Only HTML is fetched, and only its first part: JSON-LD and the article text
+# sit near the top, the rest of a heavy page is scripts, footers and embeds.
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+ARTICLE_MAX_BYTES = 1536 * 1024
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ArticleCache:
+    """Persistent cache of fetched article HTML and what was extracted from it.
+
+    Bodies are zlib-compressed and stored content-addressed (by SHA-256 of the
+    body), so the same page served under several URLs is kept once. Each URL
+    remembers its ETag / Last-Modified; once an entry is older than the TTL it
+    is revalidated with a conditional GET, and a 304 keeps both the body and
+    the extracted data. Least recently used pages are evicted when the stored
+    bodies go over `max_bytes`.
+    """
+    def __init__(self, filename="articles.sqlite", ttl=ARTICLE_TTL, max_bytes=ARTICLE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path(filename), check_same_thread=False)
+        with self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+                url_hash TEXT PRIMARY KEY, url TEXT, body_hash TEXT, etag TEXT,
+                last_modified TEXT, fetched_at REAL, accessed_at REAL, extracted TEXT)""")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS bodies (
+                body_hash TEXT PRIMARY KEY, body BLOB, size INTEGER)""")
+
+    def _lookup(self, url_hash):
+        with self._lock:
+            return self._db.execute(
+                """SELECT p.body_hash, p.etag, p.last_modified, p.fetched_at, p.extracted, b.body
+                   FROM pages p JOIN bodies b ON p.body_hash = b.body_hash
+                   WHERE p.url_hash = ?""", (url_hash,)).fetchone()
+
+    def _touch(self, url_hash, refreshed=False):
+        now = time.time()
+        with self._lock, self._db:
+            if refreshed:
+                self._db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url_hash = ?",
+                                 (now, now, url_hash))
+            else:
+                self._db.execute("UPDATE pages SET accessed_at = ? WHERE url_hash = ?", (now, url_hash))
+
+    def _store(self, url, url_hash, body, etag, last_modified):
+        body_hash = _sha256(body)
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock, self._db:
+            old = self._db.execute("SELECT body_hash FROM pages WHERE url_hash = ?", (url_hash,)).fetchone()
+            self._db.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?, ?)",
+                             (body_hash, compressed, len(compressed)))
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (url_hash, url, body_hash, etag, last_modified, now, now, "{}"))
+            if old and old[0] != body_hash:
+                # the page changed: drop its previous body unless another URL still uses it
+                self._db.execute("""DELETE FROM bodies WHERE body_hash = ?
+                                    AND NOT EXISTS (SELECT 1 FROM pages WHERE body_hash = ?)""",
+                                 (old[0], old[0]))
+            self._evict()
+
+    def _evict(self):
+        """Drops least recently used pages until the bodies fit in max_bytes. Caller holds the lock."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        if total > self.max_bytes:
+            # bodies no page points to go before any live page
+            self._db.execute("DELETE FROM bodies WHERE body_hash NOT IN (SELECT body_hash FROM pages)")
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._db.execute("SELECT url_hash FROM pages ORDER BY accessed_at LIMIT 50").fetchall()
+            if not oldest:
+                break
+            self._db.executemany("DELETE FROM pages WHERE url_hash = ?", oldest)
+            self._db.execute("DELETE FROM bodies WHERE body_hash NOT IN (SELECT body_hash FROM pages)")
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def get_page(self, url, need=None):
+        """Returns (body bytes, extracted dict) for url, fetching or revalidating as needed.
+
+        The body is None when the page could not be fetched with a 200. A stale
+        copy is served if the network fails during revalidation. When the
+        cached extracted data already holds the kind named by `need`, the
+        stored body is not decompressed and None is returned in its place.
+        """
+        url_hash = _sha256(url.encode('utf-8'))
+        entry = self._lookup(url_hash)
+
+        def cached():
+            data = json.loads(extracted)
+            return (None if need in data else zlib.decompress(compressed)), data
+
+        if entry:
+            body_hash, etag, last_modified, fetched_at, extracted, compressed = entry
+            if time.time() - fetched_at < self.ttl:
+                self._touch(url_hash)
+                return cached()
+
+        headers = {}
+        if entry and etag:
+            headers['If-None-Match'] = etag
+        if entry and last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = webclient.get(url, headers=headers, max_bytes=ARTICLE_MAX_BYTES,
+                                     allowed_types=HTML_TYPES, truncate=True)
+        except Exception:
+            if entry:
+                return cached()
+            raise
+
+        if response.status_code == 304 and entry:
+            self._touch(url_hash, refreshed=True)
+            return cached()
+
+        if response.status_code != 200:
+            return None, {}
+
+        self._store(url, url_hash, response.content,
+                    response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.content, {}
+
+    def set_extracted(self, url, kind, value):
+        """Stores data extracted from url's current body (kept until the body changes)."""
+        url_hash = _sha256(url.encode('utf-8'))
+        with self._lock, self._db:
+            row = self._db.execute("SELECT extracted FROM pages WHERE url_hash = ?", (url_hash,)).fetchone()
+            if row is None:
+                return
+            extracted = json.loads(row[0])
+            extracted[kind] = value
+            self._db.execute("UPDATE pages SET extracted = ? WHERE url_hash = ?",
+                             (json.dumps(extracted), url_hash))
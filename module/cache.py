@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+import time
+
+
+# All persistent caches live under one folder next to the CSVs the app writes
+CACHE_DIR = os.environ.get("NETSHIELD_CACHE_DIR", os.path.join(os.getcwd(), ".netshield_cache"))
+
+
+def cache_path(filename):
+    """Returns the full path of a cache file, creating the cache folder if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+
+class JsonCache:
+    """Small persistent key/value store with a per-entry TTL, backed by one JSON file."""
+    def __init__(self, filename, ttl):
+        self.path = cache_path(filename)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _expired(self, entry, now):
+        return now - entry['time'] > entry.get('ttl', self.ttl)
+
+    def get(self, key):
+        """Returns the cached value, or None if missing or older than its TTL."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or self._expired(entry, time.time()):
+            return None
+        return entry['value']
+
+    def set(self, key, value, ttl=None):
+        """Stores value; `ttl` overrides the cache default for this entry."""
+        entry = {'time': time.time(), 'value': value}
+        if ttl is not None:
+            entry['ttl'] = ttl
+        with self._lock:
+            self._data[key] = entry
+
+    def save(self):
+        """Writes the cache to disk, dropping expired entries."""
+        now = time.time()
+        with self._lock:
+            self._data = {k: v for k, v in self._data.items() if not self._expired(v, now)}
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Could not save cache {self.path}: {e}")
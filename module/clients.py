@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import weakref
+
+import streamlit as st
+from googleapiclient.discovery import build
+from openai import AsyncOpenAI, OpenAI
+
+
+# One place where API clients are built. Nothing is constructed (and no
+# secret is read) until a client is first asked for; after that the same
+# client is reused for the life of the process, across Streamlit sessions
+# and reruns.
+
+NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
+
+_clients = {}
+_lock = threading.Lock()
+
+# Async clients hold connections bound to the event loop they were made on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def secret(name, default=None):
+    """st.secrets[name], or default when the key or the whole secrets file is missing."""
+    try:
+        return st.secrets[name]
+    except Exception:
+        return default
+
+
+def get(name, factory):
+    """Returns the client registered under name, building it with factory() on first use."""
+    with _lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def nvidia():
+    """OpenAI-compatible client for the NVIDIA endpoint (summarize, translate, identifier)."""
+    return get('nvidia', lambda: OpenAI(base_url=NVIDIA_BASE_URL, api_key=st.secrets["NVIDIA_API_KEY"]))
+
+
+def nvidia_async():
+    """Async counterpart of nvidia() for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if loop not in _async_clients:
+            _async_clients[loop] = AsyncOpenAI(base_url=NVIDIA_BASE_URL, api_key=st.secrets["NVIDIA_API_KEY"])
+        return _async_clients[loop]
+
+
+def groq():
+    """Groq client for the Dashboard chat."""
+    import groq as groq_sdk
+    return get('groq', lambda: groq_sdk.Groq(api_key=st.secrets["GROQ_API_KEY"]))
+
+
+def youtube(key):
+    """YouTube Data API v3 service for one API key.
+
+    Uses the discovery document bundled with google-api-python-client, so
+    building a service does not fetch it over the network. The service is
+    shared across threads and sessions, so its own httplib2.Http must not be
+    used: execute its requests with a per-thread Http (see keypool).
+    """
+    return get(('youtube', key), lambda: build('youtube', 'v3', developerKey=key, static_discovery=True))
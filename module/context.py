@@ -0,0 +1,123 @@
+import math
+import re
+
+
+# Builds the news context handed to the summarizer. Instead of the full text
+# of every article, each article gets a share of a per-model token budget and
+# keeps its passages most relevant to the query (the video's claim).
+
+CONTEXT_TOKEN_BUDGETS = {
+    "mistralai/mistral-7b-instruct-v0.3": 3000,
+}
+DEFAULT_CONTEXT_TOKENS = 2000
+PASSAGE_WORDS = 60  # passages are groups of whole sentences of about this many words
+
+_WORD = re.compile(r'\w+')
+_SENTENCE_END = re.compile(r'(?<=[.!?\u0964])\s+')  # \u0964 is the Devanagari danda
+STOPWORDS = {
+    'the', 'and', 'for', 'that', 'with', 'this', 'from', 'are', 'was', 'were', 'has', 'have',
+    'had', 'not', 'but', 'its', 'his', 'her', 'they', 'their', 'you', 'your', 'will', 'would',
+    'can', 'could', 'about', 'into', 'than', 'then', 'there', 'what', 'when', 'which', 'who',
+    'claim', 'evidence', 'video', 'title', 'description',
+}
+
+
+def estimate_tokens(text):
+    """Approximate token count (about 4 characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _terms(text):
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+
+def _passages(text):
+    """Splits text into passages of whole sentences, about PASSAGE_WORDS words each."""
+    passages, current, words = [], [], 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        current.append(sentence)
+        words += len(sentence.split())
+        if words >= PASSAGE_WORDS:
+            passages.append(' '.join(current))
+            current, words = [], 0
+    if current:
+        passages.append(' '.join(current))
+    return [p for p in passages if p]
+
+
+def _cut(passage, tokens):
+    """Cuts a passage to about `tokens` tokens, at a word boundary."""
+    max_chars = max(0, tokens) * 4
+    if len(passage) <= max_chars:
+        return passage
+    return passage[:max_chars].rsplit(' ', 1)[0] + " ..."
+
+
+def _join(passages, chosen):
+    """Joins the chosen passages in order, marking gaps between them with ' ... '."""
+    body = ""
+    for k, j in enumerate(chosen):
+        if k:
+            body += ' ' if j == chosen[k - 1] + 1 else ' ... '
+        body += passages[j]
+    return body
+
+
+def build_context(articles, query="", model=None, budget=None):
+    """Returns (context text, stats) for a list of News articles.
+
+    Articles are taken in rank order; each gets an equal share of what is
+    left of the budget, so space unused by short articles goes to later ones.
+    Within an article, passages are ranked by IDF-weighted overlap with the
+    query (ties keep the earlier passage) and the best ones are kept in their
+    original order. Articles are serialized with News.to_prompt(); stats holds
+    the estimated tokens of the serialized articles before and after trimming.
+    """
+    budget = budget or CONTEXT_TOKEN_BUDGETS.get(model, DEFAULT_CONTEXT_TOKENS)
+    query_terms = _terms(query or "")
+
+    items = []
+    for n in articles:
+        content = n.content or ""
+        items.append((n, _passages(content), content))
+
+    # document frequency of each query term over all passages
+    all_passages = [p for _, passages, _ in items for p in passages]
+    df = {t: sum(1 for p in all_passages if t in _terms(p)) for t in query_terms}
+    idf = {t: math.log(1 + len(all_passages) / df[t]) for t in query_terms if df[t]}
+
+    blocks = []
+    remaining = budget
+    for i, (n, passages, content) in enumerate(items):
+        share = remaining // (len(items) - i) - estimate_tokens(n.to_prompt(""))
+
+        ranked = sorted(range(len(passages)),
+                        key=lambda j: (-sum(idf.get(t, 0) for t in _terms(passages[j])), j))
+        chosen, used = [], 0
+        for j in ranked:
+            cost = estimate_tokens(passages[j])
+            if used + cost > share:
+                continue
+            chosen.append(j)
+            used += cost
+
+        if chosen or not ranked:
+            body = _join(passages, sorted(chosen))
+        else:
+            # even the best passage is over the share (e.g. text without
+            # sentence breaks): keep the start of it rather than nothing
+            body = _cut(passages[ranked[0]], share)
+        block = n.to_prompt(body)
+        blocks.append(block)
+        remaining -= estimate_tokens(block)
+
+    text = '\n'.join(blocks)
+    tokens_in = estimate_tokens('\n'.join(n.to_prompt(content) for n, _, content in items))
+    tokens_out = estimate_tokens(text)
+    stats = {
+        'articles': len(items),
+        'tokens_in': tokens_in,
+        'tokens_out': tokens_out,
+        'tokens_saved': max(0, tokens_in - tokens_out),
+    }
+    return text, stats
@@ -0,0 +1,187 @@
+import html
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+
+# Fast extraction of the two things we read from article pages (JSON-LD
+# metadata and article paragraphs) with regular-expression scans instead of a
+# full BeautifulSoup tree. Both scan functions return None when a page looks
+# like something they cannot handle, and the parse_* functions below then fall
+# back to BeautifulSoup.
+
+_LD_JSON = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.I | re.S)
+
+# Tags that end an open paragraph, as in the HTML parser: any block-level
+# element opening or closing, and scripts/styles. </p> itself is optional.
+_P_END = r'(?:/?(?:p|div|section|article|main|aside|nav|header|footer|h[1-6]|ul|ol|li|dl|dt|dd|table|tr|td|th|blockquote|figure|figcaption|form|pre|hr|address|details|fieldset)|script|style)\b'
+
+# One pass over the page: ld+json is not needed here, other scripts and styles
+# are skipped so that markup inside them is not mistaken for paragraphs.
+_ARTICLE_TOKENS = re.compile(r'''
+      <script\b[^>]*>.*?</script\s*>
+    | <style\b[^>]*>.*?</style\s*>
+    | <(?P<open>article|main)\b[^>]*>
+    | </(?P<close>article|main)\s*>
+    | <p\b[^>]*>(?P<p>(?:(?!<''' + _P_END + r''').)*)(?:</p\s*>)?
+''', re.I | re.S | re.X)
+
+_CONTENT_DIV = re.compile(r'<div\b[^>]*\bclass\s*=\s*["\'][^"\']*\bcontent\b', re.I)
+_TAG = re.compile(r'<[^>]+>')
+
+
+def _decode(body):
+    if isinstance(body, str):
+        return body
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # a body truncated at the byte cap can end inside a multi-byte character
+        if e.start >= len(body) - 3:
+            return body[:e.start].decode('utf-8')
+        return None  # other encodings are left to BeautifulSoup's detection
+
+
+def scan_ld_json(body):
+    """Merges the page's ld+json blocks into one dict, stopping once articleBody is found.
+
+    Raises like json.loads on a malformed block. Returns None if the page
+    cannot be scanned (unknown encoding, or ld+json markup the scan missed).
+    """
+    text = _decode(body)
+    if text is None:
+        return None
+
+    masterjson = {}
+    found = False
+    for match in _LD_JSON.finditer(text):
+        found = True
+        masterjson.update(json.loads(match.group(1)))
+        if 'articleBody' in masterjson:
+            break
+
+    if not found and 'ld+json' in text:
+        return None
+    return masterjson
+
+
+def scan_article_paragraphs(body):
+    """Returns the text of the <p> elements of the page's main article block.
+
+    Like the BeautifulSoup version, this prefers the first <article>, then the
+    first <main>, then every paragraph on the page. It stops as soon as the
+    first <article> is closed. Returns None when the page has no article/main
+    but does have a div.content block (left to BeautifulSoup).
+    """
+    text = _decode(body)
+    if text is None:
+        return None
+
+    blocks = {'article': [], 'main': []}
+    depth = {'article': 0, 'main': 0}
+    seen = {'article': False, 'main': False}
+    closed = {'article': False, 'main': False}
+    all_paragraphs = []
+
+    for match in _ARTICLE_TOKENS.finditer(text):
+        if match.group('open'):
+            tag = match.group('open').lower()
+            if not closed[tag]:
+                depth[tag] += 1
+                seen[tag] = True
+        elif match.group('close'):
+            tag = match.group('close').lower()
+            if depth[tag]:
+                depth[tag] -= 1
+                if depth[tag] == 0:
+                    closed[tag] = True
+                    if tag == 'article':
+                        break
+        elif match.group('p') is not None:
+            paragraph = html.unescape(_TAG.sub('', match.group('p')))
+            all_paragraphs.append(paragraph)
+            for tag in blocks:
+                if depth[tag]:
+                    blocks[tag].append(paragraph)
+
+    if seen['article']:
+        return blocks['article']
+    if seen['main']:
+        return blocks['main']
+    if _CONTENT_DIV.search(text):
+        return None
+    return all_paragraphs
+
+
+# FULL PARSERS (scan first, BeautifulSoup fallback)
+# These are top-level and import nothing app-specific so they can run in
+# worker processes: raw bytes go in, only the compact fields come back.
+
+NEWS_FIELDS = ('headline', 'url', 'description', 'articleBody', 'datePublished')
+
+
+def parse_ld_json(body):
+    """Returns the page's JSON-LD reduced to the fields a News record uses."""
+    masterjson = scan_ld_json(body)
+    if masterjson is None:
+        masterjson = {}
+        soup = BeautifulSoup(body, 'html.parser')
+
+        # Find JSON ld metadata which contains clean article content
+        for script in soup.find_all('script', {"type": "application/ld+json"}):
+            masterjson.update(json.loads(script.string))
+
+    compact = {key: masterjson[key] for key in NEWS_FIELDS if key in masterjson}
+    publisher = masterjson.get('publisher')
+    if isinstance(publisher, dict):
+        compact['publisher'] = {'url': publisher.get('url', 'N/A')}
+    return compact
+
+
+def parse_article_text(body):
+    """Returns the main article text: paragraphs of more than 10 words, joined."""
+    paragraphs = scan_article_paragraphs(body)
+    if paragraphs is None:
+        soup = BeautifulSoup(body, 'html.parser')
+
+        # look for common article containers and then paragraphs
+        article_block = soup.find('article') or soup.find('main') or soup.find('div', class_='content')
+
+        if article_block:
+            paragraphs = [p.text for p in article_block.find_all('p')]
+        else:
+            # Fallback to all paragraphs if no specific block is found
+            paragraphs = [p.text for p in soup.find_all('p')]
+
+    # Filter shortjunk paragraphs and combine text
+    return ' '.join([p for p in paragraphs if len(p.split()) > 10]).strip()
+
+
+# OPTIONAL PROCESS POOL
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn: forking a process that already runs fetch threads is unsafe
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def run_parser(parser, body, use_processes=False):
+    """Runs parser(body) here, or in the shared worker-process pool when use_processes is set."""
+    if not use_processes:
+        return parser(body)
+    return _pool().submit(parser, body).result()
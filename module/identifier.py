@@ -1,12 +1,57 @@
-from openai import OpenAI
-import streamlit as st
+import re
+from enum import Enum
 
-client = OpenAI(
-  base_url = "https://integrate.api.nvidia.com/v1",
-  api_key = st.secrets["NVIDIA_API_KEY"] 
-)
+from module import clients, llm
 
-def validator(transcribed_text,user_content):
+
+# The answer is one 'STATUS (Reason)' line, so generation is capped tightly
+# and stopped as soon as a complete status and reason have been streamed.
+VERDICT_MAX_TOKENS = 48
+_VERDICT = re.compile(r'\b(GREEN|YELLOW|RED)\b[*\s:]*\(([^()\n]+)\)', re.IGNORECASE)
+_STATUS_WORD = re.compile(r'\b(GREEN|YELLOW|RED)\b', re.IGNORECASE)
+
+
+class Status(Enum):
+    GREEN = 'Green'
+    YELLOW = 'Yellow'
+    RED = 'Red'
+    UNKNOWN = 'Unknown'  # no status found in the answer
+
+
+class Verdict:
+    """Validator result: the status, the reason given for it and the raw model text."""
+    __slots__ = ('status', 'reason', 'raw')
+
+    def __init__(self, status, reason, raw):
+        self.status = status
+        self.reason = reason
+        self.raw = raw
+
+    def __repr__(self):
+        return f"Verdict({self.status.value} ({self.reason}))"
+
+
+def parse_verdict(text):
+    """Parses 'STATUS (Reason)' out of the model text.
+
+    The first well-formed status and reason wins. Failing that, the first
+    bare status word is used with an empty reason; otherwise the status is
+    UNKNOWN.
+    """
+    match = _VERDICT.search(text)
+    if match:
+        return Verdict(Status[match.group(1).upper()], match.group(2).strip(), text)
+    match = _STATUS_WORD.search(text)
+    if match:
+        return Verdict(Status[match.group(1).upper()], "", text)
+    return Verdict(Status.UNKNOWN, "", text)
+
+
+def _has_verdict(text):
+    return _VERDICT.search(text) is not None
+
+
+def _prompt(transcribed_text,user_content):
 
     # Calc word counts for the inputs
     claim_word_count = len(transcribed_text.split())
@@ -35,22 +80,33 @@ def validator(transcribed_text,user_content):
         f"YouTube Video Claim (with Source Context):\n\"{transcribed_text}\"\n\n"
         f"News Article Summary:\n\"{user_content}\""
     )
-    completion = client.chat.completions.create(
-        model="mistralai/mistral-7b-instruct-v0.3", 
-         # meta/llama3-70b-instruct   very slow
+    return a
+
+
+def validator(transcribed_text,user_content, on_token=None, echo=False):
+    """Compares the video claim with the news summary and returns a Verdict."""
+    return parse_verdict(llm.complete(clients.nvidia(), "validator", _prompt(transcribed_text, user_content),
+        "mistralai/mistral-7b-instruct-v0.3",
+        # meta/llama3-70b-instruct   very slow
         # mistralai/mistral-7b-instruct-v0.3
         # meta/llama3-8b-instruct
-        messages=[{"role":"user","content":a}],
         temperature=0.5,
         top_p=1,
-        max_tokens=1024,
-        stream=True
-    )
-    stt=""
-    for chunk in completion:
-        if chunk.choices[0].delta.content is not None:
-            
-            print(chunk.choices[0].delta.content, end="")
-            stt+=chunk.choices[0].delta.content
-
-    return stt
\ No newline at end of file
+        max_tokens=VERDICT_MAX_TOKENS,
+        on_token=on_token,
+        until=_has_verdict,
+        echo=echo
+    ))
+
+
+async def validator_async(transcribed_text,user_content, on_token=None, echo=False):
+    """validator() on the shared async client; awaits a slot under LLM_CONCURRENCY."""
+    return parse_verdict(await llm.complete_async(clients.nvidia_async(), "validator", _prompt(transcribed_text, user_content),
+        "mistralai/mistral-7b-instruct-v0.3",
+        temperature=0.5,
+        top_p=1,
+        max_tokens=VERDICT_MAX_TOKENS,
+        on_token=on_token,
+        until=_has_verdict,
+        echo=echo
+    ))
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+
+from module.quota import QuotaExceeded, QUOTA_COSTS, next_reset
+
+
+# 403 reasons meaning the key is out of daily quota until the next reset
+DAILY_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+# 403 reasons meaning the key is throttled for a short while
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+RATE_LIMIT_COOLDOWN = 60  # seconds
+FORBIDDEN_COOLDOWN = 10 * 60  # seconds, for other 403s (key disabled, API not enabled...)
+
+# httplib2.Http is not thread-safe, so services (built once per key and
+# shared) never send requests themselves: each thread executes them on its
+# own connection.
+_thread_http = threading.local()
+
+
+def _http():
+    """Returns this thread's httplib2.Http, creating it on first use."""
+    if not hasattr(_thread_http, 'http'):
+        _thread_http.http = build_http()
+    return _thread_http.http
+
+
+def _error_reason(error):
+    """Extracts the `reason` field from a googleapiclient HttpError."""
+    try:
+        return json.loads(error.content)['error']['errors'][0]['reason']
+    except Exception:
+        return ""
+
+
+class KeyState:
+    """Health and quota state of one API key in the pool."""
+    def __init__(self, key):
+        self.key = key
+        # short, non-secret label used in the ledger and in logs
+        self.label = "key-" + hashlib.sha1(key.encode()).hexdigest()[:8]
+        self.service = None
+        self.disabled_until = 0
+        self.last_error = ""
+
+    @property
+    def healthy(self):
+        return time.time() >= self.disabled_until
+
+    def disable(self, until, reason):
+        self.disabled_until = until
+        self.last_error = reason
+
+
+class YouTubeKeyPool:
+    """Spreads YouTube API calls over several keys and rotates on 403s.
+
+    Each call goes to the healthy key that has spent the least quota today.
+    When a key gets a quotaExceeded / 403 response it is parked (until the
+    daily reset for quota errors, a short cooldown otherwise) and the call is
+    retried on the next key, so a large ingestion keeps going instead of
+    aborting.
+    """
+    def __init__(self, keys, ledger, build_service):
+        # keys may also be a function returning them, called on first use
+        self._keys = None
+        self._load_keys = keys if callable(keys) else lambda: keys
+        self.ledger = ledger
+        self._build_service = build_service
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self):
+        with self._lock:
+            if self._keys is None:
+                self._keys = [KeyState(key) for key in dict.fromkeys(self._load_keys()) if key]
+            return self._keys
+
+    def _service(self, state):
+        with self._lock:
+            if state.service is None:
+                state.service = self._build_service(state.key)
+            return state.service
+
+    def _pick(self, units, tried):
+        candidates = [state for state in self.keys
+                      if state.healthy and state.label not in tried
+                      and self.ledger.can_spend(units, state.label)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda state: self.ledger.daily_units(state.label))
+
+    def execute(self, make_request, kind, run=None):
+        """Builds a request with `make_request(service)` on a chosen key and executes it.
+
+        The call is charged to `run` (a QuotaRun) if given. Raises
+        QuotaExceeded when the run budget is spent or every key is exhausted
+        or unhealthy.
+        """
+        units = QUOTA_COSTS[kind]
+        tried = set()
+        while True:
+            if run is not None and not run.can_spend(units):
+                raise QuotaExceeded(f"YouTube run budget reached ({run.units} units); refusing {kind} call.")
+            state = self._pick(units, tried)
+            if state is None:
+                raise QuotaExceeded(f"All YouTube API keys are exhausted or unhealthy; refusing {kind} call.")
+            tried.add(state.label)
+
+            request = make_request(self._service(state))
+            try:
+                return self.ledger.execute(request, kind, state.label, http=_http(), run=run)
+            except HttpError as e:
+                if e.resp.status != 403:
+                    raise
+                # a rejected call is not charged by YouTube; don't count it against the key or run
+                self.ledger.refund(kind, state.label, run=run)
+                reason = _error_reason(e)
+                if reason in DAILY_QUOTA_REASONS:
+                    state.disable(next_reset(), reason)
+                elif reason in RATE_LIMIT_REASONS:
+                    state.disable(time.time() + RATE_LIMIT_COOLDOWN, reason)
+                else:
+                    state.disable(time.time() + FORBIDDEN_COOLDOWN, reason or "forbidden")
+                print(f"YouTube key {state.label} rejected ({reason or 403}); rotating to the next key.")
+
+    @property
+    def exhausted(self):
+        """True once no key can take even a 1-unit call."""
+        return self._pick(1, set()) is None
+
+    def status(self):
+        """Returns one dict per key with its health and quota used today."""
+        return [{
+            'key': state.label,
+            'healthy': state.healthy,
+            'units_today': self.ledger.daily_units(state.label),
+            'last_error': state.last_error,
+        } for state in self.keys]
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import weakref
+
+from module import clients
+from module.context import estimate_tokens
+from module.llmcache import CompletionCache
+from module.singleflight import SingleFlight
+
+
+# Shared completion helper for summarize, translate and identifier.
+#
+# Calls are non-streaming and quiet by default, which is what batch runs
+# want. A caller that shows the text as it arrives passes `on_token`, and a
+# caller that can stop early passes `until`; only then is the response
+# streamed. echo=True prints the text to stdout.
+
+completion_cache = CompletionCache()
+
+# Functions listed under LLM_CACHE_OPT_OUT in secrets always call the model
+CACHE_OPT_OUT = set(clients.secret("LLM_CACHE_OPT_OUT", []))
+
+# Async completions in flight at once, across all wrappers
+LLM_CONCURRENCY = int(clients.secret("LLM_CONCURRENCY", 4))
+
+# Identical non-streaming prompts within a run share one completion. Calls
+# opted out of the cache only share a completion that is still running.
+flight = SingleFlight()
+uncached_flight = SingleFlight(ttl=0)
+
+# The concurrency semaphore and in-flight completions are tied to the event
+# loop they were made on; each Streamlit rerun runs a new loop.
+_loop_state = weakref.WeakKeyDictionary()
+
+usage = {}  # name -> [model calls, prompt tokens, completion tokens]
+_usage_lock = threading.Lock()
+
+
+class _LoopState:
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+        self.inflight = {}  # completion cache key -> Task
+
+
+def _state():
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        state = _loop_state[loop] = _LoopState()
+    return state
+
+
+class Completion(str):
+    """Completion text, usable as a plain str, with the token usage of the call.
+
+    Answers from the completion cache have cached=True and zero usage.
+    Callers sharing a coalesced completion all see the usage of the one
+    model call behind it; `usage` counts it once.
+    """
+    def __new__(cls, text, prompt_tokens=0, completion_tokens=0, cached=False):
+        self = super().__new__(cls, text)
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached = cached
+        return self
+
+    @property
+    def usage(self):
+        return {'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens}
+
+
+def _request(model, prompt, params, stream):
+    request = dict(model=model, messages=[{"role": "user", "content": prompt}], stream=stream, **params)
+    if stream:
+        # the last chunk then carries the usage of the whole response
+        request['stream_options'] = {'include_usage': True}
+    return request
+
+
+def _finish(name, model, prompt, params, text, reported, use_cache, echo):
+    """Builds the Completion, records its usage and stores it in the cache."""
+    if reported is not None:
+        prompt_tokens, completion_tokens = reported.prompt_tokens, reported.completion_tokens
+    else:
+        # endpoint did not report usage; fall back to the ~4 chars/token estimate
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+
+    with _usage_lock:
+        totals = usage.setdefault(name, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += prompt_tokens
+        totals[2] += completion_tokens
+
+    if echo:
+        print(text)
+    if use_cache and text:
+        completion_cache.put(name, model, prompt, params, text)
+    return Completion(text, prompt_tokens, completion_tokens)
+
+
+def _cached(name, model, prompt, params, use_cache):
+    if use_cache:
+        text = completion_cache.get(name, model, prompt, params)
+        if text is not None:
+            completion_cache.record(name, hit=True)
+            return Completion(text, cached=True)
+    return None
+
+
+def _record(name, use_cache, called_model):
+    """Counts a call that missed the cache; it is a hit if it joined another call's completion."""
+    if use_cache:
+        completion_cache.record(name, hit=not called_model)
+
+
+def complete(client, name, prompt, model, temperature, top_p, max_tokens,
+             on_token=None, until=None, echo=False, use_cache=True):
+    """Runs one chat completion through the completion cache and returns a Completion.
+
+    `name` identifies the calling function for usage and hit-rate reporting
+    and for opt-out. With `on_token`, the response is streamed and each
+    piece of text is passed to on_token as it arrives. With `until`, the
+    response is streamed and `until(text so far)` is checked after each
+    piece; once it is true the stream is closed and that text returned.
+    """
+    params = {'temperature': temperature, 'top_p': top_p, 'max_tokens': max_tokens}
+    use_cache = use_cache and name not in CACHE_OPT_OUT
+
+    cached = _cached(name, model, prompt, params, use_cache)
+    if cached is not None:
+        return cached
+
+    if on_token is not None:
+        _record(name, use_cache, called_model=True)
+        return _complete_once(client, name, model, prompt, params, use_cache, echo, until, on_token)
+
+    called = []
+
+    def leader():
+        called.append(True)
+        return _complete_once(client, name, model, prompt, params, use_cache, echo, until)
+
+    result = (flight if use_cache else uncached_flight).do(completion_cache.key(model, prompt, params), leader)
+    _record(name, use_cache, called_model=bool(called))
+    return result
+
+
+def _complete_once(client, name, model, prompt, params, use_cache, echo, until=None, on_token=None):
+    if on_token is None and until is None:
+        response = client.chat.completions.create(**_request(model, prompt, params, stream=False))
+        text = response.choices[0].message.content or ""
+        return _finish(name, model, prompt, params, text, response.usage, use_cache, echo)
+
+    completion = client.chat.completions.create(**_request(model, prompt, params, stream=True))
+    text = ""
+    reported = None
+    for chunk in completion:
+        if getattr(chunk, 'usage', None) is not None:
+            reported = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content is not None:
+            if on_token is not None:
+                on_token(chunk.choices[0].delta.content)
+            text += chunk.choices[0].delta.content
+            if until is not None and until(text):
+                # stop generating as soon as the caller has what it needs
+                completion.close()
+                break
+    return _finish(name, model, prompt, params, text, reported, use_cache, echo)
+
+
+async def complete_async(client, name, prompt, model, temperature, top_p, max_tokens,
+                         on_token=None, until=None, echo=False, use_cache=True):
+    """Async complete(): at most LLM_CONCURRENCY completions run at once.
+
+    Concurrent calls without on_token and with the same model, prompt and
+    params share one completion.
+    """
+    params = {'temperature': temperature, 'top_p': top_p, 'max_tokens': max_tokens}
+    use_cache = use_cache and name not in CACHE_OPT_OUT
+
+    cached = _cached(name, model, prompt, params, use_cache)
+    if cached is not None:
+        return cached
+
+    state = _state()
+    if on_token is not None:
+        _record(name, use_cache, called_model=True)
+        return await _complete_async_once(client, state.semaphore, name, model, prompt, params,
+                                          use_cache, echo, until, on_token)
+
+    key = completion_cache.key(model, prompt, params)
+    task = state.inflight.get(key)
+    _record(name, use_cache, called_model=task is None)
+    if task is None:
+        task = asyncio.ensure_future(_complete_async_once(client, state.semaphore, name, model, prompt,
+                                                          params, use_cache, echo, until))
+        state.inflight[key] = task
+        task.add_done_callback(lambda _: state.inflight.pop(key, None))
+    # shield so a cancelled caller does not cancel a completion others wait on
+    return await asyncio.shield(task)
+
+
+async def _complete_async_once(client, semaphore, name, model, prompt, params, use_cache, echo,
+                               until=None, on_token=None):
+    async with semaphore:
+        if on_token is None and until is None:
+            response = await client.chat.completions.create(**_request(model, prompt, params, stream=False))
+            text = response.choices[0].message.content or ""
+            reported = response.usage
+        else:
+            completion = await client.chat.completions.create(**_request(model, prompt, params, stream=True))
+            text = ""
+            reported = None
+            async for chunk in completion:
+                if getattr(chunk, 'usage', None) is not None:
+                    reported = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    if on_token is not None:
+                        on_token(chunk.choices[0].delta.content)
+                    text += chunk.choices[0].delta.content
+                    if until is not None and until(text):
+                        await completion.close()
+                        break
+    return _finish(name, model, prompt, params, text, reported, use_cache, echo)
+
+
+def usage_report():
+    """One line per function with its model calls and tokens, e.g. 'sumup: 2 calls, 1800 in / 240 out'."""
+    with _usage_lock:
+        lines = [f"{name}: {calls} calls, {prompt_tokens} in / {completion_tokens} out"
+                 for name, (calls, prompt_tokens, completion_tokens) in sorted(usage.items())]
+    return "LLM tokens: " + ("; ".join(lines) if lines else "no model calls yet")
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from module.cache import cache_path
+
+
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # stored completions, LRU-evicted past this
+
+
+class CompletionCache:
+    """Persistent cache of LLM completions, shared by all wrappers.
+
+    Entries are keyed on a hash of (model, prompt, sampling params), so
+    re-running Automate on the same video_data.csv, or a Streamlit rerun after
+    a crash, does not pay for the same completions again. Least recently used
+    entries are evicted past `max_bytes`. Hit rates are kept per calling
+    function through record().
+    """
+    def __init__(self, filename="completions.sqlite", max_bytes=LLM_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.stats = {}  # name -> [hits, misses]
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path(filename), check_same_thread=False)
+        with self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY, name TEXT, model TEXT, response TEXT,
+                size INTEGER, created_at REAL, accessed_at REAL)""")
+
+    @staticmethod
+    def key(model, prompt, params):
+        payload = json.dumps([model, prompt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def record(self, name, hit):
+        """Counts one call of `name` as answered without (hit) or with (miss) a model call."""
+        with self._lock:
+            counts = self.stats.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def get(self, name, model, prompt, params):
+        key = self.key(model, prompt, params)
+        with self._lock, self._db:
+            row = self._db.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._db.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, name, model, prompt, params, response):
+        key = self.key(model, prompt, params)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, name, model, response, len(response.encode('utf-8')), now, now))
+            self._evict()
+
+    def _evict(self):
+        """Drops least recently used completions until they fit in max_bytes. Caller holds the lock."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._db.execute("SELECT key FROM completions ORDER BY accessed_at LIMIT 100").fetchall()
+            if not oldest:
+                break
+            self._db.executemany("DELETE FROM completions WHERE key = ?", oldest)
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    def report(self):
+        """One line per function with its hit rate, e.g. 'sumup: 3/4 hits (75%)'."""
+        lines = []
+        for name, (hits, misses) in sorted(self.stats.items()):
+            total = hits + misses
+            lines.append(f"{name}: {hits}/{total} hits ({100 * hits // total}%)")
+        return "LLM cache: " + ("; ".join(lines) if lines else "no calls yet")
@@ -0,0 +1,60 @@
+import hashlib
+import re
+
+
+# Syndicated wire stories show up under several publishers with small edits.
+# Articles are compared by MinHash signatures of their word shingles, which
+# estimate the Jaccard similarity of the shingle sets.
+
+SHINGLE_SIZE = 5      # words per shingle
+NUM_PERM = 64         # MinHash signature length
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed (a, b) pairs so signatures are comparable across calls and processes
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha1(f"a{i}".encode()).digest()[:8], 'big') % _PRIME | 1,
+     int.from_bytes(hashlib.sha1(f"b{i}".encode()).digest()[:8], 'big') % _PRIME)
+    for i in range(NUM_PERM)
+]
+
+_WORD = re.compile(r'\w+')
+
+
+def _shingle_hashes(text, size=SHINGLE_SIZE):
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return {int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'big') for s in shingles}
+
+
+def minhash(text):
+    """Returns the MinHash signature (tuple of NUM_PERM ints) of text."""
+    hashes = _shingle_hashes(text)
+    return tuple(min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class NearDuplicateFilter:
+    """Accepts texts one by one, rejecting those too similar to one already accepted."""
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.signatures = []
+        self.rejected = 0
+
+    def add(self, text):
+        """Returns True and remembers text if it is distinct, False if it is a near-duplicate."""
+        if self.threshold is None or not text:
+            return True
+        signature = minhash(text)
+        if any(similarity(signature, seen) >= self.threshold for seen in self.signatures):
+            self.rejected += 1
+            return False
+        self.signatures.append(signature)
+        return True
@@ -1,42 +1,186 @@
 import requests
 from bs4 import BeautifulSoup  # for web extraction, scraping etc
 import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
 from typing import List
-import streamlit as st
+from urllib.parse import urlparse, urlsplit, urlunsplit
+from module import clients, webclient, htmlextract
+from module.articlecache import ArticleCache
+from module.cache import JsonCache
+from module.singleflight import coalesced
+from module.neardup import NearDuplicateFilter
 
 
-NEWS_API_KEY = st.secrets["NEWS_API_KEY"]  
+NEWS_API_KEY = clients.secret("NEWS_API_KEY", "")
 NEWS_API_ENDPOINT = "https://newsapi.org/v2/everything"
+PROMPT_BODY_CHARS = 2000  # article text kept per article when serialized for a prompt
+
+# Fetched article pages and their extracted JSON-LD / body, shared across runs
+article_cache = ArticleCache()
 
 
 class News:
-    """Class to hold structured news article data."""
-    def __init__(self, headline, url, publisher, description="", content="", pubDate=""):
+    """Compact record of one news article.
+
+    The article body can be left in the article cache: with `content_ref` set
+    to (kind, fetched url), `content` is loaded on access and release() drops
+    it from memory. to_prompt() serializes an article for the LLM.
+    """
+    __slots__ = ('headline', 'url', 'publisher', 'description', 'pubDate', '_content', 'content_ref')
+
+    def __init__(self, headline, url, publisher, description="", content=None, pubDate="", content_ref=None):
         self.headline = headline
         self.url = url
         self.publisher = publisher
         self.description = description
-        self.content = content
         self.pubDate = pubDate
-    
+        self.content_ref = tuple(content_ref) if content_ref else None
+        # without a body, a referenced article loads it on first access
+        self._content = "" if content is None and not self.content_ref else content
+
+    @property
+    def content(self):
+        if self._content is None:
+            return _load_body(*self.content_ref) if self.content_ref else ""
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    def release(self):
+        """Drops the body from memory if it can be reloaded from the article cache."""
+        if self.content_ref:
+            self._content = None
+
+    def to_dict(self):
+        """JSON-friendly form; a reloadable body is stored as its reference only."""
+        data = {'headline': self.headline, 'url': self.url, 'publisher': self.publisher,
+                'description': self.description, 'pubDate': self.pubDate}
+        if self.content_ref:
+            data['content_ref'] = list(self.content_ref)
+        else:
+            data['content'] = self._content
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_prompt(self, body=None, max_chars=PROMPT_BODY_CHARS):
+        """Serializes the article for an LLM prompt.
+
+        `body` replaces the article text, e.g. with the passages kept by
+        context.build_context, and is used as given. By default the content
+        is used, cut to max_chars (None keeps all of it).
+        """
+        if body is None:
+            body = self.content or ""
+            if max_chars is not None and len(body) > max_chars:
+                body = body[:max_chars].rsplit(' ', 1)[0] + " ..."
+        return (f"Headline: {self.headline}\n"
+                f"Publisher: {self.publisher}\n"
+                f"Published: {self.pubDate}\n"
+                f"Description: {self.description}\n"
+                f"Content: {body}\n")
+
     def __repr__(self):
-        return (f"headline={self.headline},\n url={self.url},\n "
-                f"publisher={self.publisher},\n description={self.description},\n "
-                f"content={self.content},\n pubDate={self.pubDate}\n")
+        return f"News(headline={self.headline!r}, publisher={self.publisher!r}, pubDate={self.pubDate!r})"
+
+
+def _load_body(kind, url):
+    """Reloads an article body from the article cache (re-fetching only if it was evicted)."""
+    if kind == 'jsonld':
+        return _extract_google_content(url).get('articleBody', '')
+    if kind == 'body':
+        return _scrape_full_article_body(url)
+    return ""
+
+# Parse article HTML in worker processes instead of threads; worth it on
+# multi-core machines when a run covers hundreds of videos.
+PARSE_IN_PROCESSES = bool(clients.secret("NEWS_PARSE_PROCESSES", False))
+
+# CONCURRENT FETCH HELPERS
+
+MAX_FETCH_WORKERS = 8  # article pages fetched in parallel per query
+MAX_PER_HOST = 2       # never hit one publisher with more than this at once
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(url):
+    """Returns the semaphore bounding concurrent fetches to the url's host."""
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+
+def _fetch_with_host_limit(fetch, url):
+    with _host_slot(url):
+        return fetch(url)
+
+# PUBLICATION DATE WINDOW
+
+NEWS_WINDOW_DAYS = 30  # pages keep news published within this many days of the video
+
+def _parse_date(value):
+    """Parses an ISO 8601 date ('2024-05-01T10:00:00Z') or datetime into an aware UTC datetime."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _date_window(published_at, window_days):
+    """Returns (start, end) around published_at, or None when no filter applies."""
+    if published_at is None or window_days is None:
+        return None
+    center = _parse_date(published_at)
+    if center is None:
+        return None
+    return center - timedelta(days=window_days), center + timedelta(days=window_days)
+
+
+def _in_window(published, window) -> bool:
+    """Articles with an unknown date are kept, since they cannot be judged."""
+    return window is None or published is None or window[0] <= published <= window[1]
+
+
+def _ds2_published(article):
+    """Publication time of a Google News ds:2 article entry ([seconds] at index 4), if present."""
+    try:
+        return datetime.fromtimestamp(int(article[4][0]), tz=timezone.utc)
+    except (IndexError, TypeError, ValueError, OverflowError):
+        return None
 
 # GOOGLE NEWS SCRAPING 
 
+# Per-URL extraction only joins a fetch of the same URL that is still
+# running: finished results are reused through the article cache, so bodies
+# are not pinned in memory, and empty results (failed fetches) are not reused.
+@coalesced(ttl=0, remember=bool)
 def _extract_google_content(url):
     """Scrapes content from a single article link found by Google News scraper."""
     try:
-        response = requests.get(url, allow_redirects=True, timeout=10)
+        body, extracted = article_cache.get_page(url, need='jsonld')
+        if 'jsonld' in extracted:
+            return extracted['jsonld']
+
         masterjson = {}
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')           
-            
-            # Find JSON ld metadata which contains clean article content
-            for script in soup.find_all('script', {"type": "application/ld+json"}):                
-                masterjson.update(json.loads(script.string))
+        if body is not None:
+            masterjson = htmlextract.run_parser(htmlextract.parse_ld_json, body, PARSE_IN_PROCESSES)
+            article_cache.set_extracted(url, 'jsonld', masterjson)
 
         return masterjson
 
@@ -45,88 +189,122 @@ def _extract_google_content(url):
         return {}
 
 
-def _scrape_google_news(query: str, limit: int = 5) -> List[News]:
-    """Tries to fetch high-quality articles using Google News scraping."""
+class FetchFailed(list):
+    """Empty result of a news fetch that failed (bad status, timeout, API error).
+
+    It behaves like [] for callers, but unlike a clean "no articles" result
+    it is not cached.
+    """
+
+
+def _scrape_google_news(query: str, limit: int = 5, window=None) -> List[News]:
+    """Tries to fetch high-quality articles using Google News scraping.
+
+    Candidates dated outside `window` (start, end) are dropped before their
+    pages are fetched.
+    """
     query = query.replace(" ","%20")
     url = f"https://news.google.com/search?q={query}&hl=en-IN&gl=IN&ceid=IN%3Aen"
     result = []
     
     try:
-        response = requests.get(url, allow_redirects=True)
+        response = webclient.get(url)
         if response.status_code != 200:
-            return [] # Fail fast if status code is bad
+            print(f"Google News returned status {response.status_code}.")
+            return FetchFailed() # Fail fast if status code is bad
 
         soup = BeautifulSoup(response.content, 'html.parser')
         # Target the specific script tag that holds article data
         datascript = soup.find('script', {"class": "ds:2"})
 
-        if datascript:
-            data = datascript.string
-            start = data.find('data:[')
-            end = data.rfind(']')
+        if not datascript:
+            # not a results page (consent or error page, changed layout)
+            print("Google News page has no result data.")
+            return FetchFailed()
 
-            if start != -1 and end != -1:
-                list_data_str = data[start+5:end+1]
-                list_data = json.loads(list_data_str)
+        data = datascript.string
+        start = data.find('data:[')
+        end = data.rfind(']')
 
-                # Process first 25 items found in the data structure
-                for news_item in list_data[1][0][:25]:
-                    
-                    # Logic to extract URL based on structure variations
-                    if len(news_item) == 2:
-                        link = news_item[1][2][0][6]
-                    elif len(news_item) == 8:
-                        link = news_item[0][6]
-                    else:
-                        continue # Skip unknown structure
+        if start != -1 and end != -1:
+            list_data_str = data[start+5:end+1]
+            list_data = json.loads(list_data_str)
+
+            # Process first 25 items found in the data structure
+            links = []
+            out_of_window = 0
+            for news_item in list_data[1][0][:25]:
+                
+                # Logic to extract URL based on structure variations
+                if len(news_item) == 2:
+                    article = news_item[1][2][0]
+                elif len(news_item) == 8:
+                    article = news_item[0]
+                else:
+                    continue # Skip unknown structure
+
+                if not _in_window(_ds2_published(article), window):
+                    out_of_window += 1
+                    continue
+                links.append(article[6])
+
+            if out_of_window:
+                print(f"Skipped {out_of_window} Google News candidates outside the date window.")
 
-                    # Extract full content using JSON-LD scraper
-                    masterjson = _extract_google_content(link)
+            # Extract full content using JSON-LD scraper. Links are fetched
+            # speculatively in parallel but consumed in rank order; whatever is
+            # still pending once `limit` articles are found is cancelled.
+            executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS)
+            try:
+                futures = [(link, executor.submit(_fetch_with_host_limit, _extract_google_content, link))
+                           for link in links]
+                # Duplicates (same URL or near-identical text) do not count
+                # towards `limit`, so the next ranked link refills the slot
+                seen_urls = set()
+                distinct = NearDuplicateFilter(NEAR_DUP_THRESHOLD)
+                for link, future in futures:
+                    masterjson = future.result()
 
                     if masterjson and "articleBody" in masterjson:
-                        result.append(News(
+                        news = News(
                             masterjson.get('headline', 'N/A'),
                             masterjson.get('url', 'N/A'),
                             masterjson.get('publisher', {}).get('url', 'N/A'),
                             masterjson.get('description', 'N/A'),
                             masterjson.get('articleBody', 'N/A'),
-                            masterjson.get('datePublished', 'N/A')
-                        ))
+                            masterjson.get('datePublished', 'N/A'),
+                            content_ref=('jsonld', link)
+                        )
+                        if not _accept_distinct(news, seen_urls, distinct):
+                            continue
+                        result.append(news)
                         limit -= 1
                         if limit == 0:
                             break
-                        
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                    
         return result
     except Exception as e:
         print(f"Google News Scraper Error: {e}")
-        return []
+        return FetchFailed()
 
 # NEWSaPI HELPER FUNCTIONS High Coverage
 
+@coalesced(ttl=0, remember=bool)  # see _extract_google_content
 def _scrape_full_article_body(url: str) -> str:
     """Fetches the URL and attempts to scrape the main article text."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status() 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        body, extracted = article_cache.get_page(url, need='body')
+        if 'body' in extracted:
+            return extracted['body']
+        if body is None:
+            return ""
 
-        # look for common article containers and then paragraphs
-        article_block = soup.find('article') or soup.find('main') or soup.find('div', class_='content')
-        
-        paragraphs = []
-        if article_block:
-             paragraphs = article_block.find_all('p')
-        else:
-             # Fallback to all paragraphs if no specific block is found
-             paragraphs = soup.find_all('p')
+        full_text = htmlextract.run_parser(htmlextract.parse_article_text, body, PARSE_IN_PROCESSES)
 
-        # Filter shortjunk paragraphs and combine text
-        full_text = ' '.join([p.text for p in paragraphs if len(p.text.split()) > 10]) 
-             
-        return full_text.strip()
+        article_cache.set_extracted(url, 'body', full_text)
+        return full_text
 
     except requests.exceptions.RequestException as e:
         # print(f"Error scraping article at {url}: {e}")
@@ -136,76 +314,258 @@ def _scrape_full_article_body(url: str) -> str:
         return ""
 
 
-def _api_fetch_articles(query: str, limit: int = 5) -> List[News]:
-    """Fetches articles using NewsAPI as a fallback."""
-    if NEWS_API_KEY == st.secrets["NEWS_API_KEY"]:
+SNIPPET_SUFFICIENT_WORDS = 60  # API description + content at least this long skips the body scrape
+
+
+def _api_snippet(article) -> str:
+    """Combines the NewsAPI description and truncated content, minus the '[+N chars]' marker."""
+    content = re.sub(r'\s*\[\+\d+ chars\]$', '', article.get('content') or '')
+    return ' '.join(part for part in (article.get('description') or '', content) if part).strip()
+
+
+def _api_fetch_articles(query: str, limit: int = 5, window=None, sufficient_words: int = SNIPPET_SUFFICIENT_WORDS) -> List[News]:
+    """Fetches articles using NewsAPI as a fallback.
+
+    Full bodies are scraped concurrently, and only for articles whose API
+    snippet is shorter than `sufficient_words` words and that were published
+    inside `window` (start, end), if one is given.
+    """
+    if not NEWS_API_KEY:
         print("NewsAPI key is not configured. Skipping fallback.")
-        return []
+        return FetchFailed()
         
     params = {
         'q': query,
         'apiKey': NEWS_API_KEY,
         'sortBy': 'relevancy',
         'language': 'en',
-        'pageSize': limit
+        # a few extra candidates to refill slots freed by duplicates
+        'pageSize': min(100, limit + NEWS_REFILL_EXTRA)
     }
+    if window:
+        params['from'] = window[0].strftime('%Y-%m-%dT%H:%M:%S')
+        params['to'] = window[1].strftime('%Y-%m-%dT%H:%M:%S')
     
     results = []
     
     try:
-        response = requests.get(NEWS_API_ENDPOINT, params=params, timeout=15)
+        response = webclient.get(NEWS_API_ENDPOINT, params=params, timeout=(5, 15))
         response.raise_for_status()
         data = response.json()
         
-        if data['status'] == 'ok' and data['articles']:
-            for article in data['articles']:
-                url = article.get('url', 'N/A')
-                
-                # Scrape the full article content
-                full_content_text = _scrape_full_article_body(url)
+        if data.get('status') != 'ok':
+            print(f"NewsAPI error: {data.get('message', data.get('status'))}")
+            return FetchFailed()
+
+        if data['articles']:
+            articles = [article for article in data['articles']
+                        if _in_window(_parse_date(article.get('publishedAt') or ''), window)]
+            snippets = [_api_snippet(article) for article in articles]
+
+            # Scrape the full article content, in parallel, where the snippet is too thin
+            executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS)
+            try:
+                bodies = [None if len(snippet.split()) >= sufficient_words
+                          else executor.submit(_fetch_with_host_limit, _scrape_full_article_body, article.get('url', 'N/A'))
+                          for article, snippet in zip(articles, snippets)]
+                bodies = [body.result() if body is not None else None for body in bodies]
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            skipped = bodies.count(None)
+            print(f"NewsAPI: {len(articles) - skipped} bodies scraped, {skipped} skipped (snippet sufficient).")
 
+            for article, snippet, full_content_text in zip(articles, snippets, bodies):
                 results.append(
                     News(
                         headline=article.get('title', 'N/A'),
-                        url=url,
+                        url=article.get('url', 'N/A'),
                         publisher=article.get('source', {}).get('name', 'N/A'),
                         description=article.get('description', ''),
-                        # Store the scraped full text, falling back to API content snippet
-                        content=full_content_text or article.get('content', ''), 
-                        pubDate=article.get('publishedAt', 'N/A')
+                        # Store the scraped full text, falling back to API content snippet.
+                        # Unscraped (sufficient) articles keep the combined snippet.
+                        content=snippet if full_content_text is None else (full_content_text or article.get('content', '')), 
+                        pubDate=article.get('publishedAt', 'N/A'),
+                        # only a scraped body can be reloaded from the article cache
+                        content_ref=('body', article.get('url', 'N/A')) if full_content_text else None
                     )
                 )
-        return results
+        return _dedup_news(results, limit)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from NewsAPI: {e}")
-        return []
+        return FetchFailed()
     except Exception as e:
         print(f"General error processing API response: {e}")
-        return []
+        return FetchFailed()
+
+# QUERY RESULT CACHE
+
+NEWS_CACHE_TTL = 6 * 60 * 60    # seconds, for queries that returned articles
+NEWS_NEGATIVE_TTL = 30 * 60     # seconds, for queries that returned nothing
+news_cache = JsonCache("news_queries.json", NEWS_CACHE_TTL)
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercases and collapses whitespace/quotes so equivalent LLM queries share a key."""
+    return " ".join(query.lower().strip(' "\'.').split())
+
+
+def _cached_fetch(source: str, fetch, query: str, limit: int, window=None) -> List[News]:
+    """Runs fetch(query, limit, window) through the query cache, keyed on (query, limit, source, window).
+
+    Empty results are cached too, for a shorter TTL, so dead queries are not
+    re-scraped on every run. Failed fetches (FetchFailed) are not cached.
+    """
+    key = f"{source}|{limit}|{_normalize_query(query)}"
+    if window:
+        key += f"|{window[0]:%Y-%m-%d}|{window[1]:%Y-%m-%d}"
+    cached = news_cache.get(key)
+    if cached is not None:
+        print(f"Using cached {source} results ({len(cached)} articles) for query: '{query}'")
+        return [News.from_dict(article) for article in cached]
+
+    results = fetch(query, limit, window)
+    if isinstance(results, FetchFailed):
+        return results
+    news_cache.set(key, [n.to_dict() for n in results], ttl=None if results else NEWS_NEGATIVE_TTL)
+    news_cache.save()
+
+    # bodies stay in the article cache until someone reads them
+    for n in results:
+        n.release()
+    return results
+
+# URL DEDUPLICATION
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'ocid', 'cmpid')
+
+
+def _canonical_url(url: str) -> str:
+    """Normalizes an article URL so the same story from both sources compares equal."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = '&'.join(p for p in parts.query.split('&')
+                     if p and not p.lower().startswith(TRACKING_PARAMS))
+    path = parts.path.rstrip('/')
+    if path.endswith('/amp'):
+        path = path[:-4]
+    return urlunsplit(('https', host, path, query, ''))
+
+
+NEAR_DUP_THRESHOLD = 0.8  # estimated shingle Jaccard similarity at which articles count as copies (None = off)
+NEWS_REFILL_EXTRA = 3     # extra NewsAPI candidates requested to replace dropped duplicates
+
+
+def _accept_distinct(n: News, seen_urls: set, distinct: NearDuplicateFilter) -> bool:
+    """True (and recorded) unless n repeats an accepted article's canonical URL or is a near-copy of its text."""
+    key = _canonical_url(n.url) if n.url and n.url != 'N/A' else None
+    if key in seen_urls:
+        return False
+    if not distinct.add(n.content):
+        return False
+    if key:
+        seen_urls.add(key)
+    return True
+
+
+def _dedup_news(articles: List[News], limit: int) -> List[News]:
+    """Keeps the first of each set of duplicate articles, in order, up to limit.
+
+    Duplicates are the same canonical URL or near-identical content
+    (syndicated wire copies under different publishers).
+    """
+    seen_urls = set()
+    distinct = NearDuplicateFilter(NEAR_DUP_THRESHOLD)
+    unique = []
+    for n in articles:
+        if len(unique) == limit:
+            break
+        if _accept_distinct(n, seen_urls, distinct):
+            unique.append(n)
+    if distinct.rejected:
+        print(f"Dropped {distinct.rejected} near-duplicate articles.")
+    return unique
 
 # MASTER FUNCTION WITH FALLBACK LOGI
 
-def get_news_list(query: str, limit: int = 5) -> List[News]:
+NEWS_HEDGE_DELAY = 4.0  # seconds before NewsAPI is started next to Google (0 = race at once, None = serial fallback)
+NEWS_DEADLINE = 25.0    # seconds to wait for both sources before returning what is ready
+
+
+def _hedged_news(query: str, limit: int, hedge_delay: float, deadline: float, window=None) -> List[News]:
+    """Starts Google News, then NewsAPI once Google is slow or short, and merges by deadline.
+
+    Google results come first (accuracy); NewsAPI articles fill the remaining
+    slots. Whatever has not finished by the deadline is left out.
+    """
+    end = time.monotonic() + deadline
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        google = executor.submit(_cached_fetch, 'google', _scrape_google_news, query, limit, window)
+        wait([google], timeout=hedge_delay)
+        if google.done() and len(google.result()) >= limit:
+            return _dedup_news(google.result(), limit)
+
+        print("Google News is slow or short on results. Querying NewsAPI in parallel.")
+        newsapi = executor.submit(_cached_fetch, 'newsapi', _api_fetch_articles, query, limit, window)
+
+        pending = {google, newsapi}
+        while pending:
+            done, pending = wait(pending, timeout=max(0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"News deadline of {deadline}s reached; using the sources that finished.")
+                break
+            if google.done() and len(google.result()) >= limit:
+                break
+
+        results = google.result() if google.done() else []
+        if newsapi.done():
+            results = results + newsapi.result()
+        return _dedup_news(results, limit)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Empty results are not reused: they may come from a failed fetch, and a
+# clean "no articles" answer is already in the query cache.
+@coalesced(key=lambda query, limit=5, **options: (_normalize_query(query), limit, tuple(sorted(options.items()))),
+           remember=bool)
+def get_news_list(query: str, limit: int = 5, hedge_delay=NEWS_HEDGE_DELAY, deadline=NEWS_DEADLINE,
+                  published_at=None, window_days=None) -> List[News]:
     """
     Tries Google News scraping first for high accuracy. 
-    If that fails or returns zero results, it falls back to NewsAPI for better coverage.
+    If that is slow or returns too few results, NewsAPI is queried in parallel
+    (after `hedge_delay` seconds) and the two are merged, deduplicated by URL.
+    With hedge_delay=None, NewsAPI is only used after Google returned nothing.
+    With published_at (e.g. the video's 'Published At') and window_days, only
+    articles dated within window_days of it are fetched.
     """
+    window = _date_window(published_at, window_days)
+
+    if hedge_delay is not None:
+        print(f"Attempting Google News scrape (NewsAPI hedge after {hedge_delay}s) for query: '{query}'")
+        results = _hedged_news(query, limit, hedge_delay, deadline, window)
+        if not results:
+            print("No news context found after trying both sources.")
+        return results
     
     # 1 Try Google News Scraping ( Accuracy
     print(f"Attempting Google News scrape for query: '{query}'")
-    results = _scrape_google_news(query, limit)
+    results = _cached_fetch('google', _scrape_google_news, query, limit, window)
     
     if len(results) < limit and len(results) == 0:
         # 2 Fallback to NewsAPI (Highest Coverage)
         print("Google News scraping failed or returned insufficient results. Falling back to NewsAPI.")
-        fallback_results = _api_fetch_articles(query, limit)
+        fallback_results = _cached_fetch('newsapi', _api_fetch_articles, query, limit, window)
         
         # Merge or replace (since Google failed)
         if fallback_results:
              print(f"Successfully fetched {len(fallback_results)} articles from NewsAPI.")
-             return fallback_results
+             return _dedup_news(fallback_results, limit)
         
     if not results:
          print("No news context found after trying both sources.")
          
-    return results
\ No newline at end of file
+    return _dedup_news(results, limit)
\ No newline at end of file
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from module.cache import cache_path
+
+
+# YouTube Data API v3 cost in quota units per call, by resource
+QUOTA_COSTS = {
+    'search': 100,
+    'videos': 1,
+    'channels': 1,
+}
+DEFAULT_DAILY_LIMIT = 10000
+
+# The daily quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+def next_reset():
+    """Returns the epoch time of the next daily quota reset."""
+    now = datetime.now(QUOTA_TIMEZONE)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.timestamp()
+
+
+class QuotaExceeded(Exception):
+    """Raised when a call would go over the run budget or the daily limit."""
+
+
+class QuotaRun:
+    """Quota spent by one call such as video_info(), with its optional unit budget.
+
+    Each call starts its own run, so concurrent calls (and sessions) sharing
+    the ledger do not spend from or inherit each other's budget.
+    """
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.units = 0
+        self.calls = {}
+
+    def can_spend(self, units):
+        return self.budget is None or self.units + units <= self.budget
+
+
+class QuotaLedger:
+    """Tracks YouTube quota units spent per run and per day, for each API key.
+
+    Every API request goes through execute() (or spend()), which refuses the
+    call before it is sent if it would exceed the given run's budget or the
+    key's daily limit. Daily totals are persisted to disk so separate runs (and
+    Streamlit reruns) share them.
+    """
+    def __init__(self, daily_limit=DEFAULT_DAILY_LIMIT, filename="youtube_quota.json"):
+        self.daily_limit = daily_limit
+        self.path = cache_path(filename)
+        self._lock = threading.Lock()
+
+    def _today(self):
+        return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+    def _load_today(self):
+        """Returns {key: units} spent today."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                today = json.load(f).get(self._today(), {})
+        except (OSError, ValueError):
+            return {}
+        # files written before per-key accounting hold a plain number
+        return today if isinstance(today, dict) else {"default": today}
+
+    def _save_today(self, units_by_key):
+        # written to a temp file and swapped in, so readers never see a torn file
+        tmp_path = self.path + ".tmp"
+        try:
+            # keep only today's entry, older days are no longer relevant
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({self._today(): units_by_key}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save quota ledger {self.path}: {e}")
+
+    def daily_units(self, key=None):
+        """Units spent today by one key, or by all keys when key is None."""
+        today = self._load_today()
+        return sum(today.values()) if key is None else today.get(key, 0)
+
+    def start_run(self, budget=None):
+        """Returns a new QuotaRun. budget=None means only the daily limit applies."""
+        return QuotaRun(budget)
+
+    def can_spend(self, units, key="default", run=None):
+        return (run is None or run.can_spend(units)) and self.daily_units(key) + units <= self.daily_limit
+
+    def spend(self, kind, key="default", units=None, run=None):
+        """Reserves the cost of one call, raising QuotaExceeded if it does not fit."""
+        units = QUOTA_COSTS[kind] if units is None else units
+        with self._lock:
+            if not self.can_spend(units, key, run):
+                raise QuotaExceeded(
+                    f"YouTube quota budget reached ({run.units if run else 0} units this run, "
+                    f"{self.daily_units(key)}/{self.daily_limit} today on {key}); refusing {kind} call."
+                )
+            today = self._load_today()
+            today[key] = today.get(key, 0) + units
+            self._save_today(today)
+            if run is not None:
+                run.units += units
+                run.calls[kind] = run.calls.get(kind, 0) + 1
+
+    def refund(self, kind, key="default", units=None, run=None):
+        """Gives back the cost of a call that spend() reserved but the API rejected."""
+        units = QUOTA_COSTS[kind] if units is None else units
+        with self._lock:
+            today = self._load_today()
+            today[key] = max(0, today.get(key, 0) - units)
+            self._save_today(today)
+            if run is not None:
+                run.units = max(0, run.units - units)
+                if run.calls.get(kind, 0) > 1:
+                    run.calls[kind] -= 1
+                else:
+                    run.calls.pop(kind, None)
+
+    def execute(self, request, kind, key="default", http=None, run=None):
+        """Charges the ledger (and run) for `request` and then executes it (on `http` if given)."""
+        self.spend(kind, key, run=run)
+        return request.execute(http=http)
+
+    def report(self, run=None):
+        today = self._load_today()
+        keys = ", ".join(f"{key}: {units}" for key, units in today.items())
+        daily = f"{sum(today.values())} today" + (f" ({keys})" if keys else "")
+        if run is None:
+            return f"YouTube quota: {daily}"
+        calls = ", ".join(f"{kind}: {count}" for kind, count in run.calls.items()) or "none"
+        return f"YouTube quota: {run.units} units this run ({calls}), {daily}"
@@ -0,0 +1,98 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+# In a hashtag campaign many videos end up asking for the same news query,
+# article URL or LLM prompt. Calls with identical inputs are coalesced: the
+# first caller does the work, concurrent callers wait for it, and callers
+# within `ttl` seconds afterwards reuse the result.
+
+SINGLE_FLIGHT_TTL = 10 * 60  # seconds a finished result is shared
+SINGLE_FLIGHT_MAX_ENTRIES = 512
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result."""
+    def __init__(self, ttl=SINGLE_FLIGHT_TTL, max_entries=SINGLE_FLIGHT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._calls = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _forget(self, key, call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def _reusable(self, call):
+        return not call.done.is_set() or time.time() - call.finished_at <= self.ttl
+
+    def do(self, key, fn, *args, remember=None, **kwargs):
+        """Runs fn(*args, **kwargs) or joins the call already running for key.
+
+        A result for which remember(result) is false is shared with waiting
+        callers but not reused afterwards.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None or not self._reusable(call)
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.misses += 1
+                while len(self._calls) > self.max_entries:
+                    self._calls.popitem(last=False)
+            else:
+                self._calls.move_to_end(key)
+                self.hits += 1
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+                if remember is not None and not remember(call.result):
+                    self._forget(key, call)
+            except BaseException as e:
+                call.error = e
+                # failures are shared with waiting callers but not remembered
+                self._forget(key, call)
+            finally:
+                call.finished_at = time.time()
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+def coalesced(key=None, ttl=SINGLE_FLIGHT_TTL, remember=None):
+    """Decorator that coalesces calls with the same inputs through a SingleFlight.
+
+    `key(*args, **kwargs)` builds the coalescing key; by default the arguments
+    themselves are used, so they must be hashable. Callers share the returned
+    object and must not mutate it. See SingleFlight.do for `remember`.
+    """
+    def decorator(fn):
+        flight = SingleFlight(ttl)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return flight.do(k, fn, *args, remember=remember, **kwargs)
+
+        wrapper.flight = flight
+        return wrapper
+    return decorator
@@ -1,40 +1,51 @@
-from openai import OpenAI
-import streamlit as st
-
-client = OpenAI(
-  base_url = "https://integrate.api.nvidia.com/v1",
-  api_key = st.secrets["NVIDIA_API_KEY"] 
-)
- 
-def sumup(a):
+import asyncio
+
+from module import clients, context, llm
+
+MODEL = "mistralai/mistral-7b-instruct-v0.3"
+
+
+def sumup(a, query=None, on_token=None, echo=False):
+    """Summarizes text, or a list of News articles.
+
+    Articles are first trimmed to the model's context budget, keeping the
+    passages most relevant to `query` (e.g. the video's claim). Pass
+    on_token to stream the summary to a UI; see llm.complete.
+    """
+    return llm.complete(clients.nvidia(), "sumup", _summary_prompt(_input_text(a, query)), MODEL,
+                        temperature=0.2, top_p=0.7, max_tokens=1024, on_token=on_token, echo=echo)
+
+
+def _input_text(a, query):
+    if isinstance(a, (list, tuple)):
+        text, stats = context.build_context(a, query=query, model=MODEL)
+        print(f"News context: {stats['articles']} articles, ~{stats['tokens_out']} tokens "
+              f"(~{stats['tokens_saved']} saved of ~{stats['tokens_in']}).")
+        return text
+    return str(a)
+
+
+def _summary_prompt(text):
     # This remains the same, used for News Summary
-    con = """You are an advanced text summarization model. Your task is to provide a concise, factual summary of the input text provided below. 
+    return """You are an advanced text summarization model. Your task is to provide a concise, factual summary of the input text provided below. 
 CRITICAL RULE: The summary must strictly be based ONLY on the input text. If the input text is non-sensical, contains junk, or is too short, simply provide the shortest possible summary or return the original text if it's the most relevant content. DO NOT flag short input as irrelevant.
 
 SUMMARY REQUIRED:
-""" + str(a)
-
-    completion = client.chat.completions.create(
-    model="mistralai/mistral-7b-instruct-v0.3",
-    messages=[{"role":"user","content":con}],
-    temperature=0.2,
-    top_p=0.7,
-    max_tokens=1024,
-    stream=True
-    )
-    s=""
-
-    for chunk in completion:
-     if chunk.choices[0].delta.content is not None:
-        print(chunk.choices[0].delta.content, end="")
-        s+=chunk.choices[0].delta.content
-    return s
+""" + text
+
+
+async def sumup_async(a, query=None, on_token=None, echo=False):
+    """sumup() on the shared async client; awaits a slot under LLM_CONCURRENCY."""
+    # Reading article bodies may hit the article cache or the network, so the
+    # context is built on a worker thread instead of blocking the event loop
+    text = await asyncio.to_thread(_input_text, a, query)
+    return await llm.complete_async(clients.nvidia_async(), "sumup", _summary_prompt(text), MODEL,
+                                    temperature=0.2, top_p=0.7, max_tokens=1024, on_token=on_token, echo=echo)
 
 #  NEW FUNCTION FOR  CLAIM EXTRACTION
 
-def extract_claim(a):
-    """Extracts a focused claim and evidence from sparse video metadata (Title/Description)."""
-    con = """You are a forensic analyst. Your task is to analyze the sparse YouTube video metadata (Title and Description) provided below and extract the single, most critical factual claim and the evidence supporting it. 
+def _claim_prompt(a):
+    return """You are a forensic analyst. Your task is to analyze the sparse YouTube video metadata (Title and Description) provided below and extract the single, most critical factual claim and the evidence supporting it. 
     
     CRITICAL RULE:
     1. Output MUST start with 'Claim:'.
@@ -47,17 +58,14 @@ def extract_claim(a):
     VIDEO METADATA:
     """ + str(a)
 
-    completion = client.chat.completions.create(
-    model="mistralai/mistral-7b-instruct-v0.3",
-    messages=[{"role":"user","content":con}],
-    temperature=0.2,
-    top_p=0.7,
-    max_tokens=1024,
-    stream=True
-    )
-    s=""
-
-    for chunk in completion:
-     if chunk.choices[0].delta.content is not None:
-        s+=chunk.choices[0].delta.content
-    return s
\ No newline at end of file
+
+def extract_claim(a, on_token=None, echo=False):
+    """Extracts a focused claim and evidence from sparse video metadata (Title/Description)."""
+    return llm.complete(clients.nvidia(), "extract_claim", _claim_prompt(a), MODEL, temperature=0.2, top_p=0.7, max_tokens=1024,
+                        on_token=on_token, echo=echo)
+
+
+async def extract_claim_async(a, on_token=None, echo=False):
+    """extract_claim() on the shared async client."""
+    return await llm.complete_async(clients.nvidia_async(), "extract_claim", _claim_prompt(a), MODEL,
+                                    temperature=0.2, top_p=0.7, max_tokens=1024, on_token=on_token, echo=echo)
\ No newline at end of file
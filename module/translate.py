@@ -1,14 +1,11 @@
 
-from openai import OpenAI
-import streamlit as st
-
-client = OpenAI(
-  base_url = "https://integrate.api.nvidia.com/v1",
-  api_key = st.secrets["NVIDIA_API_KEY"] 
-)
- 
-def trans(a):
-    con = """You are an advanced language model capable of understanding and translating multiple languages. 
+from module import clients, llm
+
+MODEL = "mistralai/mistral-7b-instruct-v0.3"
+
+
+def _prompt(a):
+    return """You are an advanced language model capable of understanding and translating multiple languages. 
     Your task is to translate the provided text into English. Do not provide context or explanations. 
     Only return the translated text, and ensure it is clear, accurate, and concise. 
     CRITICAL RULE: The translated text must be a minimal, high-relevance search query. You must:
@@ -20,18 +17,13 @@ def trans(a):
     The text to translate is as follows:
     """ + str(a)
 
-    completion = client.chat.completions.create(
-    model="mistralai/mistral-7b-instruct-v0.3",
-    messages=[{"role":"user","content":con}],
-    temperature=0.2,
-    top_p=0.7,
-    max_tokens=1024,
-    stream=True
-    )
-    ss=""
-
-    for chunk in completion:
-     if chunk.choices[0].delta.content is not None:
-        print(chunk.choices[0].delta.content, end="")
-        ss+=chunk.choices[0].delta.content
-    return ss
\ No newline at end of file
+
+def trans(a, on_token=None, echo=False):
+    return llm.complete(clients.nvidia(), "trans", _prompt(a), MODEL,
+                        temperature=0.2, top_p=0.7, max_tokens=1024, on_token=on_token, echo=echo)
+
+
+async def trans_async(a, on_token=None, echo=False):
+    """trans() on the shared async client; awaits a slot under LLM_CONCURRENCY."""
+    return await llm.complete_async(clients.nvidia_async(), "trans", _prompt(a), MODEL,
+                                    temperature=0.2, top_p=0.7, max_tokens=1024, on_token=on_token, echo=echo)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Shared HTTP layer for all scraping: one pooled session, so repeated fetches to
+# news.google.com and the same publishers reuse keep-alive connections and TLS.
+
+DEFAULT_TIMEOUT = (5, 10)  # (connect, read) seconds
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+POOL_HOSTS = 32     # hosts kept in the connection pool
+POOL_PER_HOST = 8   # open connections kept per host
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """Raised when a response body goes over the size cap."""
+
+
+class UnsupportedContentType(requests.exceptions.RequestException):
+    """Raised when a response has a content type the caller did not accept."""
+
+
+def session():
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+            s.mount('http://', adapter)
+            s.mount('https://', adapter)
+            s.headers.update({'User-Agent': USER_AGENT})
+            _session = s
+        return _session
+
+
+def get(url, max_bytes=MAX_RESPONSE_BYTES, allowed_types=None, truncate=False, **kwargs):
+    """GET through the shared session with default timeouts and a body size cap.
+
+    The body is streamed. Past `max_bytes` the download is aborted with
+    ResponseTooLarge, or, with truncate=True, stopped and the prefix kept
+    (`response.truncated` is then True). If `allowed_types` is given, a
+    response whose Content-Type matches none of them is rejected with
+    UnsupportedContentType before any of the body is read. The returned
+    response is fully read, so `.content`, `.text` and `.json()` work as usual.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    kwargs.setdefault('allow_redirects', True)
+    response = session().get(url, stream=True, **kwargs)
+    try:
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if allowed_types and content_type and content_type not in allowed_types:
+            raise UnsupportedContentType(f"{url} is {content_type}")
+
+        declared = response.headers.get('Content-Length', '')
+        if not truncate and declared.isdigit() and int(declared) > max_bytes:
+            raise ResponseTooLarge(f"{url} is {declared} bytes (cap {max_bytes})")
+
+        chunks = []
+        size = 0
+        response.truncated = False
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if size + len(chunk) > max_bytes:
+                if not truncate:
+                    raise ResponseTooLarge(f"{url} is over {max_bytes} bytes")
+                chunks.append(chunk[:max_bytes - size])
+                response.truncated = True
+                # the rest of the body is still unread: drop the connection
+                # instead of returning it to the pool
+                response.raw.close()
+                break
+            size += len(chunk)
+            chunks.append(chunk)
+
+        response._content = b"".join(chunks)
+        response._content_consumed = True
+    finally:
+        response.close()
+    return response
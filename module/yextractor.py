@@ -1,65 +1,175 @@
 # FULL WORKING 
 
 import csv
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import streamlit as st 
+from module import clients
+from module.cache import JsonCache
+from module.quota import QuotaLedger, QuotaExceeded, QUOTA_COSTS
+from module.keypool import YouTubeKeyPool
 
 
-api_key = st.secrets["YOUTUBE_API_KEY"] 
-youtube = build('youtube', 'v3', developerKey=api_key)
+def api_keys():
+    # Several projects' keys can be listed under YOUTUBE_API_KEYS; a single
+    # YOUTUBE_API_KEY still works on its own.
+    return list(clients.secret("YOUTUBE_API_KEYS", [])) or [st.secrets["YOUTUBE_API_KEY"]]
 
-def videoData(video_id):
+# Every YouTube request is charged here before it is sent
+quota = QuotaLedger(daily_limit=int(clients.secret("YOUTUBE_DAILY_QUOTA", 10000)))
+# Keys are read, and services built, on the first request
+pool = YouTubeKeyPool(api_keys, quota, clients.youtube)
 
-    try:
-        request = youtube.videos().list(
-            part="statistics",
-            id=video_id
-        )
-        response = request.execute()
+# Statistics fields actually written to the CSV; used as the `fields` mask so
+# the API only returns what we need.
+VIDEO_STATS_FIELDS = "items(id,statistics(viewCount,likeCount,dislikeCount,commentCount))"
+VIDEO_BATCH_SIZE = 50  # videos().list accepts at most 50 ids per call
 
-        # Video statistics
-        video_stats = response['items'][0]['statistics']
-        views = int(video_stats.get('viewCount', 0))
-        likes = int(video_stats.get('likeCount', 0))
-        dislikes = int(video_stats.get('dislikeCount', 0))
-        comment_count = int(video_stats.get('commentCount', 0))
 
-        return views, likes, dislikes, comment_count
+def _parse_video_stats(video_stats):
+    views = int(video_stats.get('viewCount', 0))
+    likes = int(video_stats.get('likeCount', 0))
+    dislikes = int(video_stats.get('dislikeCount', 0))
+    comment_count = int(video_stats.get('commentCount', 0))
+    return views, likes, dislikes, comment_count
 
-    except Exception as e:
-        print(f"Error fetching statistics for video {video_id}: {e}")
-        return None, None, None, None
 
-def channelData(channel_id):
+def videoDataBatch(video_ids, run=None):
+    """Fetches statistics for many videos, 50 ids per videos().list call.
 
-    try:
-        request = youtube.channels().list(
-            part="snippet,statistics",
-            id=channel_id
-        )
-        response = request.execute()
-
-        # Channel metadata
-        channel_info = response['items'][0]
-        channel_title = channel_info['snippet']['title']
-        channel_id = channel_info['id']
-        channel_description = channel_info['snippet']['description']
-        subscriber_count = channel_info['statistics'].get('subscriberCount', 'N/A')
-        total_views = channel_info['statistics'].get('viewCount', 'N/A')
-        video_count = channel_info['statistics'].get('videoCount', 'N/A')
-
-        return channel_title, channel_id, subscriber_count, total_views, video_count, channel_description
+    Returns a dict of video_id -> (views, likes, dislikes, comment_count).
+    Videos that could not be fetched are missing from the dict.
+    """
+    stats = {}
+    video_ids = list(dict.fromkeys(video_ids))  # dedup, keep order
 
-    except Exception as e:
-        print(f"Error fetching metadata for channel {channel_id}: {e}")
-        return None, None, None, None, None, None
+    for i in range(0, len(video_ids), VIDEO_BATCH_SIZE):
+        chunk = video_ids[i:i + VIDEO_BATCH_SIZE]
+        try:
+            response = pool.execute(lambda youtube: youtube.videos().list(
+                part="statistics",
+                id=",".join(chunk),
+                fields=VIDEO_STATS_FIELDS,
+                maxResults=len(chunk)
+            ), 'videos', run)
 
-def video_info(hashtag, latitude, longitude, radius='50km', max_results=10, start_date=None, end_date=None, csv_filename="video_data.csv"):
+            for item in response.get('items', []):
+                stats[item['id']] = _parse_video_stats(item.get('statistics', {}))
+
+        except QuotaExceeded as e:
+            print(f"Skipping statistics for {len(video_ids) - i} videos: {e}")
+            break
+        except Exception as e:
+            print(f"Error fetching statistics for videos {chunk}: {e}")
+
+    return stats
+
+
+def videoData(video_id):
+
+    stats = videoDataBatch([video_id])
+    if video_id not in stats:
+        return None, None, None, None
+    return stats[video_id]
+
+# Channel metadata changes slowly, so it is cached on disk between runs
+CHANNEL_CACHE_TTL = 24 * 60 * 60  # seconds
+CHANNEL_FIELDS = "items(id,snippet(title,description),statistics(subscriberCount,viewCount,videoCount))"
+channel_cache = JsonCache("channels.json", CHANNEL_CACHE_TTL)
+
+
+def _parse_channel(channel_info):
+    channel_title = channel_info['snippet']['title']
+    channel_id = channel_info['id']
+    channel_description = channel_info['snippet']['description']
+    subscriber_count = channel_info['statistics'].get('subscriberCount', 'N/A')
+    total_views = channel_info['statistics'].get('viewCount', 'N/A')
+    video_count = channel_info['statistics'].get('videoCount', 'N/A')
+
+    return channel_title, channel_id, subscriber_count, total_views, video_count, channel_description
+
+
+def channelDataBatch(channel_ids, run=None):
+    """Fetches metadata for many channels, serving from the on-disk cache first.
+
+    Cache misses are fetched 50 ids per channels().list call. Returns a dict of
+    channel_id -> (title, id, subscribers, total views, video count, description).
+    """
+    channels = {}
+    misses = []
+    for channel_id in dict.fromkeys(channel_ids):
+        cached = channel_cache.get(channel_id)
+        if cached is not None:
+            channels[channel_id] = tuple(cached)
+        else:
+            misses.append(channel_id)
+
+    for i in range(0, len(misses), VIDEO_BATCH_SIZE):
+        chunk = misses[i:i + VIDEO_BATCH_SIZE]
+        try:
+            response = pool.execute(lambda youtube: youtube.channels().list(
+                part="snippet,statistics",
+                id=",".join(chunk),
+                fields=CHANNEL_FIELDS,
+                maxResults=len(chunk)
+            ), 'channels', run)
+
+            for channel_info in response.get('items', []):
+                channel_data = _parse_channel(channel_info)
+                channels[channel_info['id']] = channel_data
+                channel_cache.set(channel_info['id'], list(channel_data))
+
+        except QuotaExceeded as e:
+            print(f"Skipping channel enrichment for {len(misses) - i} channels: {e}")
+            break
+        except Exception as e:
+            print(f"Error fetching metadata for channels {chunk}: {e}")
+
+    if misses:
+        channel_cache.save()
+
+    return channels
 
+
+def channelData(channel_id):
+
+    channels = channelDataBatch([channel_id])
+    if channel_id not in channels:
+        print(f"Error fetching metadata for channel {channel_id}")
+        return None, None, None, None, None, None
+    return channels[channel_id]
+
+ENRICH_WORKERS = 4  # bounded pool for page prefetch and statistics/channel lookups
+
+
+def _search_page(hashtag, latitude, longitude, radius, page_size, page_token, start_date, end_date, run=None):
+    """Fetches one page of search results (100 quota units)."""
+    return pool.execute(lambda youtube: youtube.search().list(
+        part="snippet",
+        q=hashtag,
+        type="video",
+        location=f"{latitude},{longitude}",
+        locationRadius=radius,
+        maxResults=page_size,
+        pageToken=page_token,
+        publishedAfter=start_date.strftime('%Y-%m-%dT%H:%M:%SZ') if start_date else None,
+        publishedBefore=end_date.strftime('%Y-%m-%dT%H:%M:%SZ') if end_date else None,
+    ), 'search', run)
+
+
+def video_info(hashtag, latitude, longitude, radius='50km', max_results=10, start_date=None, end_date=None, csv_filename="video_data.csv", quota_budget=None):
+    """Searches videos and writes them, with statistics and channel data, to a CSV.
+
+    The next search page is prefetched while the current page is enriched on a
+    small worker pool; rows are still written in search order. Returns the
+    QuotaRun with the quota this call spent (capped at `quota_budget` units).
+    """
+    run = quota.start_run(quota_budget)
+    executor = ThreadPoolExecutor(max_workers=ENRICH_WORKERS)
     try:
-        next_page_token = None
         video_count = 0  # Track the total number of videos processed
+        run_channels = {}  # channel metadata already fetched during this run
+        search_args = (hashtag, latitude, longitude, radius)
 
         # Save to CSV file
         with open(csv_filename, mode='w', newline='', encoding='utf-8') as csvfile:
@@ -72,30 +182,21 @@ def video_info(hashtag, latitude, longitude, radius='50km', max_results=10, star
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
 
-            while video_count < max_results:
-                request = youtube.search().list(
-                    part="snippet",
-                    q=hashtag,
-                    type="video",
-                    location=f"{latitude},{longitude}",
-                    locationRadius=radius,
-                    maxResults=min(50, max_results - video_count),  # Request only remaining videos
-                    pageToken=next_page_token,
-                    publishedAfter=start_date.strftime('%Y-%m-%dT%H:%M:%SZ') if start_date else None,
-                    publishedBefore=end_date.strftime('%Y-%m-%dT%H:%M:%SZ') if end_date else None,
-                )
-                response = request.execute()
+            # Request only remaining videos
+            page_future = executor.submit(_search_page, *search_args, min(50, max_results), None, start_date, end_date, run)
 
-                for item in response.get('items', []):
-                    if video_count >= max_results:
-                        break  # Stop once max_results is reached
+            while page_future is not None and video_count < max_results:
+                try:
+                    response = page_future.result()
+                except QuotaExceeded as e:
+                    print(f"Stopping search after {video_count} videos: {e}")
+                    break
+                page_future = None
 
-                    video_title = item['snippet']['title']
-                    video_description = item['snippet']['description']
-                    video_id = item['id']['videoId']
+                # Collect the page first so statistics can be fetched in one batch
+                page_items = []
+                for item in response.get('items', []):
                     published_at = item['snippet']['publishedAt']
-                    channel_title = item['snippet']['channelTitle']
-                    channel_id = item['snippet']['channelId']
 
                     # Convert the publishedAt to datetime
                     published_datetime = datetime.strptime(published_at, '%Y-%m-%dT%H:%M:%SZ')
@@ -105,13 +206,44 @@ def video_info(hashtag, latitude, longitude, radius='50km', max_results=10, star
                         if not (start_date <= published_datetime <= end_date):
                             continue
 
-                    # Get video statistics (views, likes, dislikes, comments)
-                    views, likes, dislikes, comment_count = videoData(video_id)
+                    page_items.append(item)
+
+                # Prefetch the next page while this one is enriched, sized for what
+                # this page cannot cover. Skipped only when this page already fills the run.
+                next_page_token = response.get('nextPageToken')
+                remaining = max_results - video_count - len(page_items)
+                if next_page_token and remaining > 0:
+                    page_future = executor.submit(_search_page, *search_args, min(50, remaining), next_page_token, start_date, end_date, run)
+
+                # Get video statistics (views, likes, dislikes, comments) and channel
+                # metadata for channels not seen earlier in this run, concurrently
+                stats_future = executor.submit(videoDataBatch, [item['id']['videoId'] for item in page_items], run)
+                new_channels = [item['snippet']['channelId'] for item in page_items
+                                if item['snippet']['channelId'] not in run_channels]
+                channels_future = executor.submit(channelDataBatch, new_channels, run)
+                page_stats = stats_future.result()
+                run_channels.update(channels_future.result())
+
+                for item in page_items:
+                    if video_count >= max_results:
+                        break  # Stop once max_results is reached
+
+                    video_title = item['snippet']['title']
+                    video_description = item['snippet']['description']
+                    video_id = item['id']['videoId']
+                    published_at = item['snippet']['publishedAt']
+                    channel_title = item['snippet']['channelTitle']
+                    channel_id = item['snippet']['channelId']
+
+                    views, likes, dislikes, comment_count = page_stats.get(video_id, (None, None, None, None))
 
                     # Channel metadata
-                    channel_data = channelData(channel_id)
-                    if channel_data[0] is None:
-                        continue
+                    channel_data = run_channels.get(channel_id)
+                    if channel_data is None:
+                        if not pool.exhausted and run.can_spend(1):
+                            continue
+                        # Degraded row: out of quota, keep the video with search snippet data only
+                        channel_data = (channel_title, channel_id, 'N/A', 'N/A', 'N/A', '')
                     channel_title, channel_id, subscriber_count, total_views, video_count_data, channel_description = channel_data
 
                     
@@ -152,38 +284,93 @@ def video_info(hashtag, latitude, longitude, radius='50km', max_results=10, star
 
                     video_count += 1  # Increment video count
 
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    break  
+                # Rows were skipped (missing channel data): fetch one more page
+                if page_future is None and next_page_token and video_count < max_results:
+                    page_future = executor.submit(_search_page, *search_args, min(50, max_results - video_count), next_page_token, start_date, end_date, run)
 
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(quota.report(run))
+    return run
+
+
+
+# Topic counts are cheap to reuse within a day for the same hashtag and period
+TOPIC_COUNT_CACHE_TTL = 6 * 60 * 60  # seconds
+SEARCH_COST = QUOTA_COSTS['search']
+topic_count_cache = JsonCache("topic_counts.json", TOPIC_COUNT_CACHE_TTL)
 
 
+def total_videos_on_topic(hashtag, start_date=None, end_date=None, max_results=50,
+                          exact=False, max_pages=5, quota_budget=500):
+    """Returns the number of videos on a topic in the given period.
 
-def total_videos_on_topic(hashtag, start_date=None, end_date=None, max_results=50):
+    By default this is an estimate from `pageInfo.totalResults` of a single
+    search call. With exact=True the search results are paged and counted, but
+    never more than `max_pages` pages or `quota_budget` quota units (None
+    for no run budget), so the count is a lower bound when a cap is hit.
+    Counts are cached per (hashtag, date range, mode and caps); a count cut
+    short by a cap or by running out of quota is returned but not cached.
+    """
+    published_after = start_date.strftime('%Y-%m-%dT%H:%M:%SZ') if start_date else None
+    published_before = end_date.strftime('%Y-%m-%dT%H:%M:%SZ') if end_date else None
+    cache_key = f"{hashtag}|{published_after}|{published_before}|" + (
+        f"exact|{max_results}|{max_pages}|{quota_budget}" if exact else "estimate")
 
-    
+    cached = topic_count_cache.get(cache_key)
+    if cached is not None:
+        print(f"Total videos for the topic '{hashtag}' in the given period (cached): {cached}")
+        return cached
+
+    run = quota.start_run(quota_budget)
     try:
         total_videos = 0
         next_page_token = None
+        page_limit = 1
+        if exact:
+            # quota_budget=None: only max_pages (and the daily limit) cap the count
+            page_limit = max_pages if quota_budget is None else min(max_pages, quota_budget // SEARCH_COST)
+        pages = 0
+        complete = False  # True once the count did not stop at a cap
+
+        while pages < page_limit:
+            try:
+                response = pool.execute(lambda youtube: youtube.search().list(
+                    part="id",
+                    q=hashtag,
+                    type="video",
+                    maxResults=max_results if exact else 1,
+                    pageToken=next_page_token,
+                    publishedAfter=published_after,
+                    publishedBefore=published_before,
+                    fields="nextPageToken,pageInfo(totalResults),items(id(videoId))",
+                ), 'search', run)
+            except QuotaExceeded as e:
+                if not exact or pages == 0:
+                    raise
+                print(f"Stopped counting '{hashtag}' after {pages} pages: {e}")
+                break
+            pages += 1
 
-        while True:
-            request = youtube.search().list(
-                part="snippet",
-                q=hashtag,
-                type="video",
-                maxResults=max_results,
-                pageToken=next_page_token,
-                publishedAfter=start_date.strftime('%Y-%m-%dT%H:%M:%SZ') if start_date else None,
-                publishedBefore=end_date.strftime('%Y-%m-%dT%H:%M:%SZ') if end_date else None,
-            )
-            response = request.execute()
+            if not exact:
+                total_videos = int(response.get('pageInfo', {}).get('totalResults', 0))
+                complete = True
+                break
 
             total_videos += len(response.get('items', []))
             next_page_token = response.get('nextPageToken')
             if not next_page_token:
+                complete = True
                 break
+        else:
+            print(f"Stopped counting '{hashtag}' after {pages} pages (page cap / quota budget reached).")
+
+        if complete:
+            topic_count_cache.set(cache_key, total_videos)
+            topic_count_cache.save()
 
         print(f"Total videos for the topic '{hashtag}' in the given period: {total_videos}")
         return total_videos
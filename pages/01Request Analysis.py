@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime
 from module import yextractor as youtube
+from module import webclient
 import requests
 import os
 
@@ -11,11 +12,12 @@ import os
 def get_coordinates(city_name):
     """Fetch latitude and longitude for a given city name."""
     url = f'https://nominatim.openstreetmap.org/search?city={city_name}&format=json'
+    # Nominatim's usage policy asks for an application User-Agent, not a browser one
     headers = {
         'User-Agent': 'stream/1.0'
     }
     try:
-        response = requests.get(url, headers=headers, timeout=5)
+        response = webclient.get(url, headers=headers, timeout=5)
         response.raise_for_status() # raise an exception for bad status codes
         data = response.json()
         if data:
@@ -156,7 +158,8 @@ if submitted or autox:
         # Fetch video data
         progress_bar.progress(50, text="Fetching video data from YouTube...")
 
-        youtube.video_info(hashtag, lat, lon, radius, max_results, start_date_dt, end_date_dt, csv_filename)
+        quota_run = youtube.video_info(hashtag, lat, lon, radius, max_results, start_date_dt, end_date_dt, csv_filename)
+        st.caption(youtube.quota.report(quota_run))
 
         try:
             # Load the file just created 
@@ -123,6 +123,8 @@ try:
     # Check if expected columns exist or infer
     video_titles = df.iloc[:, df.columns.get_loc('Video Title')] if 'Video Title' in df.columns else df.iloc[:, 1]
     
+    published_dates = df['Published At'] if 'Published At' in df.columns else [None] * len(video_titles)
+
     if video_titles.empty:
          st.warning("The data file is empty or missing expected column for video titles.")
          st.stop()
@@ -136,7 +138,7 @@ try:
     st.markdown("---")
     
     # Iterate through all video titles
-    for i in video_titles:
+    for i, published_at in zip(video_titles, published_dates):
         
         # video header 
         st.markdown(f"### Video {k+1}: {i}") 
@@ -152,12 +154,12 @@ try:
                 initial_query = i # Fallback to raw title
             
             # 2. Attempt search with the concise query
-            ns = nx.get_news_list(initial_query)
+            ns = nx.get_news_list(initial_query, published_at=published_at, window_days=nx.NEWS_WINDOW_DAYS)
 
             # 3. Robustness Check: If initial search failed, try the full video title
             if not ns:
                 # Use the full, original title (i) as the search query
-                ns = nx.get_news_list(i) 
+                ns = nx.get_news_list(i, published_at=published_at, window_days=nx.NEWS_WINDOW_DAYS) 
 
         # --- END 
         if ns:
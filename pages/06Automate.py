@@ -10,7 +10,9 @@ from module import nextractor as nx
 from module import summarize as sumz
 from module import translate as tst
 from module import identifier as idefy
+from module import clients, llm
 import altair as alt
+import asyncio
 import os 
 
 
@@ -150,6 +152,7 @@ video_Link = df['Video URL']
 video_descriptions = df['Description']
 channel_titles = df['Channel Title'] 
 subscriber_counts = df['Subscriber Count']
+published_dates = df['Published At']
 
 k=0
 Finalaclist=[]
@@ -157,147 +160,142 @@ processing_bar = st.progress(0)
 total_videos = len(video_titles)
 progress_increment = 100 / total_videos
 
+# Videos analysed at once. Their LLM calls also share the llm.LLM_CONCURRENCY slots
+VIDEO_CONCURRENCY = int(clients.secret("AUTOMATE_VIDEO_CONCURRENCY", 3))
+
 st.subheader(f"2. Processing {total_videos} Videos")
 
 # Initialize container for detailed output display
 
 details_container = st.container()
 
-# Update the loop to include new metadata columns
-for k, (link, title, description, channel_title, subscriber_count) in enumerate(zip(video_Link, video_titles, video_descriptions, channel_titles, subscriber_counts)):
-    with details_container:
-        st.markdown(f"---")
-        st.markdown(f"### 🎬 Video {k+1}: {title}")
-        
-        
-        # 2 Content Source (ENRICHED METADATA)
-        
-        # CRITICAL imppp '
-        # Using Title and Description as the sole content source for the LLM
-        content = f"""
+
+def video_content(title, description):
+    # CRITICAL imppp '
+    # Using Title and Description as the sole content source for the LLM
+    return f"""
 Video Title: {title}
 Video Description: {description}
 """
-        
-        st.markdown("#### Raw Video Content")
-        
-        # Only exit if absolutely no content exists (Title and Description are both empty)
-        if not title.strip() and not description.strip(): 
-            Finalaclist.append('Yellow')
-            st.warning("Status: Yellow (No content at all: Title and Description were empty.)")
-            processing_bar.progress(int(((k + 1) * progress_increment)))
-            continue
-            
-        st.expander("View Full Content").text(content)
-
-
-        # 2 Structured Claim Extraction & Context Fetch
-     
-        st.markdown("#### LLM Claim Extraction")
-        
-        #  Extract the claim (Using the new extract_claim function)
-        with st.spinner("Extracting factual claim and source authority ..."):
-            try:
-                # Use the 'content' (Metadata Rich) as input for extraction
-                contentsum=sumz.extract_claim(content)
-            except AttributeError:
-                st.error("Error: `sumz.extract_claim` not found. Assuming 'sumup' was intended.")
-                contentsum=sumz.sumup(content) 
-            except NameError:
-                st.error("Error: `sumz` module failed to load.")
-                contentsum = "IRRELEVANT_CONTENT_FLAG" 
-        
-        st.markdown(f"**Video Claim (Mistral):**")
-        st.info(contentsum)
 
-        #  Fetch News Context
-        st.markdown("#### Contextual News Search")
-        
-        # Ensure the module function exists and works
-        try:
-            initial_query = tst.trans(title)
-        except NameError:
-            st.error("Error: `tst.trans` module not found or failed to load. Using raw title as query.")
-            initial_query = title # Fallback to raw title
-        
-      
-        with st.spinner(f"Fetching and Summarizing Context for: '{initial_query}'..."):
-            
-            try:
-                 # 1. Try the concise query first
-                ns=nx.get_news_list(initial_query, limit=5)
-            except NameError:
-                st.error("Error: `nx.get_news_list` module not found or failed to load.")
-                ns = []
-
-            # 2. Add RobustnessIf no resultstry the full video title as a broad query
-            if not ns:
-                 # Removed st.info line as requested, using print for log only
-                 print(f"INFO: Query fallback executed for video {k+1}. Retrying with full video title.")
-                 
-                 try:
-                     # Use the full, original title as the search query
-                     ns_retry=nx.get_news_list(title, limit=5) 
-                     # Assign the results of the retry to ns
-                     if ns_retry:
-                          ns = ns_retry
-                 except NameError:
-                     pass
-
-            if not ns:
-                Finalaclist.append('Yellow')
-                st.warning("Status: Yellow (News Context Missing/Scrape Failed)")
-                k+=1
-                processing_bar.progress(int((k * progress_increment)))
-                continue
-            
-            # 3 Summarize News Content
-            try:
-                # The spinner is still active during this step
-                newssum=sumz.sumup(ns)
-            except NameError:
-                newssum = "NO_NEWS_SUMMARY" # Fallback if module fails
-
-        # -END OF SPINNER BLOCK 
-        
-        st.markdown(f"**{len(ns)} Related News Articles Found.** (Full article on **Current Context Report** page)")
-        
-        st.markdown(f"**News Summary (Mistral):**")
-        st.success(newssum)
 
-      
-        #  Final Validation
-   
-        st.markdown("#### Final Validation Status")
-
-        with st.spinner("Running Llama 3 for Final Validation. This might take a while..."):
-            try:
-                # The validator compares the claim (contentsum) against the news (newssum)
-                state=idefy.validator(contentsum,newssum).strip() # .strip() ensures no leading/trailing spaces
-            except NameError:
-                st.error("Error: `idefy.validator` module not found or failed to load.")
-                state = "YELLOW (Module Error)"
-        
-        
-        # Clean up output and assign final status
-
-        if "RED" in state.upper():
-            Finalaclist.append('Red')
-            st.error(f"Status: **RED** (Misinformation/Content Abuse Detected)")
-        elif "YELLOW" in state.upper():
-            Finalaclist.append('Yellow')
-            st.warning(f"Status: **YELLOW** (Partial Accuracy/Discrepancies Found)")
-        elif "GREEN" in state.upper():
-            Finalaclist.append('Green')
-            st.success(f"Status: **GREEN** (High Alignment/Accurate)")
+async def fetch_context(k, title, initial_query, published_at):
+    # get_news_list blocks on scraping, so it runs on a worker thread
+    # 1. Try the concise query first
+    ns = await asyncio.to_thread(nx.get_news_list, initial_query, limit=5, published_at=published_at, window_days=nx.NEWS_WINDOW_DAYS)
+
+    # 2. Add RobustnessIf no resultstry the full video title as a broad query
+    if not ns:
+        print(f"INFO: Query fallback executed for video {k+1}. Retrying with full video title.")
+        ns = await asyncio.to_thread(nx.get_news_list, title, limit=5, published_at=published_at, window_days=nx.NEWS_WINDOW_DAYS)
+    return ns
+
+
+async def analyze_video(k, title, content, published_at, slots):
+    """Runs claim extraction, news search, summary and validation for one video."""
+    async with slots:
+        # The claim and the search query both only need the metadata, so they overlap
+        contentsum, initial_query = await asyncio.gather(
+            sumz.extract_claim_async(content),  # Use the 'content' (Metadata Rich) as input for extraction
+            tst.trans_async(title),
+        )
+        ns = await fetch_context(k, title, initial_query, published_at)
+        if not ns:
+            return {'claim': contentsum, 'query': initial_query, 'news': []}
+
+        # 3 Summarize News Content, trimmed to the passages relevant to the claim
+        newssum = await sumz.sumup_async(ns, query=contentsum)
+        # The validator compares the claim (contentsum) against the news (newssum)
+        verdict = await idefy.validator_async(contentsum, newssum)
+        return {'claim': contentsum, 'query': initial_query, 'news': ns, 'summary': newssum, 'verdict': verdict}
+
+
+def show_result(result):
+    """Renders one video's analysis and appends its status to Finalaclist."""
+    st.markdown("#### LLM Claim Extraction")
+    st.markdown(f"**Video Claim (Mistral):**")
+    st.info(result['claim'])
+
+    #  Fetch News Context
+    st.markdown("#### Contextual News Search")
+    st.caption(f"Search query: '{result['query']}'")
+
+    ns = result['news']
+    if not ns:
+        Finalaclist.append('Yellow')
+        st.warning("Status: Yellow (News Context Missing/Scrape Failed)")
+        return
+
+    st.markdown(f"**{len(ns)} Related News Articles Found.** (Full article on **Current Context Report** page)")
+
+    st.markdown(f"**News Summary (Mistral):**")
+    st.success(result['summary'])
+
+
+    #  Final Validation
+
+    st.markdown("#### Final Validation Status")
+
+    # Assign final status from the parsed verdict
+    verdict = result['verdict']
+
+    if verdict.status is idefy.Status.RED:
+        Finalaclist.append('Red')
+        st.error(f"Status: **RED** (Misinformation/Content Abuse Detected)")
+    elif verdict.status is idefy.Status.YELLOW:
+        Finalaclist.append('Yellow')
+        st.warning(f"Status: **YELLOW** (Partial Accuracy/Discrepancies Found)")
+    elif verdict.status is idefy.Status.GREEN:
+        Finalaclist.append('Green')
+        st.success(f"Status: **GREEN** (High Alignment/Accurate)")
+    else:
+        # Fallback for unexpected LLM output
+        Finalaclist.append('Yellow')
+        st.warning(f"Status: YELLOW (LLM returned ambiguous status: {verdict.raw.strip()})")
+
+    if verdict.reason:
+        st.caption(f"Reason: {verdict.reason}")
+
+
+async def process_videos():
+    # Every video is scheduled up front; results are shown in order as they finish
+    slots = asyncio.Semaphore(VIDEO_CONCURRENCY)
+    videos = list(zip(video_Link, video_titles, video_descriptions, channel_titles, subscriber_counts, published_dates))
+    tasks = []
+    for k, (link, title, description, channel_title, subscriber_count, published_at) in enumerate(videos):
+        # Only skip if absolutely no content exists (Title and Description are both empty)
+        if not title.strip() and not description.strip():
+            tasks.append(None)
         else:
-            # Fallback for unexpected LLM output
-            Finalaclist.append('Yellow')
-            st.warning(f"Status: YELLOW (LLM returned ambiguous status: {state})")
+            tasks.append(asyncio.ensure_future(analyze_video(k, title, video_content(title, description), published_at, slots)))
+
+    for k, ((link, title, description, channel_title, subscriber_count, published_at), task) in enumerate(zip(videos, tasks)):
+        with details_container:
+            st.markdown(f"---")
+            st.markdown(f"### 🎬 Video {k+1}: {title}")
+
+            st.markdown("#### Raw Video Content")
+
+            if task is None:
+                Finalaclist.append('Yellow')
+                st.warning("Status: Yellow (No content at all: Title and Description were empty.)")
+            else:
+                st.expander("View Full Content").text(video_content(title, description))
+
+                with st.spinner("Extracting claim, fetching news context and validating. This might take a while..."):
+                    try:
+                        result = await task
+                    except Exception as e:
+                        result = None
+                        Finalaclist.append('Yellow')
+                        st.warning(f"Status: Yellow (Analysis failed: {e})")
+                if result is not None:
+                    show_result(result)
+
+        processing_bar.progress(int(((k + 1) * progress_increment)))
 
-        k += 1
-        processing_bar.progress(int((k * progress_increment)))
 
+asyncio.run(process_videos())
 
 #  Final Report Generation  !!!!!!!!!!
 
@@ -306,6 +304,8 @@ processing_bar.progress(100)
 
 st.subheader("3. Final Account Report")
 st.success(f"Analysis Complete! {len(Finalaclist)} videos processed.")
+st.caption(llm.completion_cache.report())
+st.caption(llm.usage_report())
 
 data={
     'Video Title': df['Video Title'].head(len(Finalaclist)),                      # Only include titles that were processed